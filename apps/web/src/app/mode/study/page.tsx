@@ -465,6 +465,7 @@ export default function StudyModePage() {
             label: stage.stage_name || `Trace Stage ${index + 1}`,
             description: stage.description || `Trace processing stage ${index + 1}`,
             image_base64: stage.image_base64 || stage.image,
+            mime_type: stage.mime_type,
             type: 'trace'
           }))
 
@@ -1302,7 +1303,7 @@ export default function StudyModePage() {
                         onClick={() => setViewingStage(stage)}
                       >
                         <img
-                          src={`data:image/jpeg;base64,${stage.image_base64}`}
+                          src={`data:${stage.mime_type || 'image/jpeg'};base64,${stage.image_base64}`}
                           alt={stage.label}
                           className="w-full h-full object-contain"
                         />
@@ -1324,8 +1325,8 @@ export default function StudyModePage() {
                         <button
                           onClick={() => {
                             const link = document.createElement('a')
-                            link.href = `data:image/jpeg;base64,${stage.image_base64}`
-                            link.download = `step-${index + 1}-${stage.label.toLowerCase().replace(/\s+/g, '-')}-${Date.now()}.jpg`
+                            link.href = `data:${stage.mime_type || 'image/jpeg'};base64,${stage.image_base64}`
+                            link.download = `step-${index + 1}-${stage.label.toLowerCase().replace(/\s+/g, '-')}-${Date.now()}.${(stage.mime_type || 'image/jpeg').split('/')[1]}`
                             link.click()
                           }}
                           className="flex-1 btn-secondary text-xs flex items-center justify-center gap-1"
@@ -1453,7 +1454,7 @@ export default function StudyModePage() {
               {/* Full-Size Image */}
               <div className="bg-gray-900 rounded-b-lg overflow-hidden flex items-center justify-center">
                 <img
-                  src={`data:image/jpeg;base64,${viewingStage.image_base64}`}
+                  src={`data:${viewingStage.mime_type || 'image/jpeg'};base64,${viewingStage.image_base64}`}
                   alt={viewingStage.label}
                   className="max-w-full max-h-[85vh] object-contain"
                   onClick={(e) => e.stopPropagation()}
@@ -1479,9 +1480,9 @@ export default function StudyModePage() {
                   onClick={(e) => {
                     e.stopPropagation()
                     const link = document.createElement('a')
-                    link.href = `data:image/jpeg;base64,${viewingStage.image_base64}`
+                    link.href = `data:${viewingStage.mime_type || 'image/jpeg'};base64,${viewingStage.image_base64}`
                     const stepNum = processedImageStages.indexOf(viewingStage) + 1
-                    link.download = `step-${stepNum}-${viewingStage.label.toLowerCase().replace(/\s+/g, '-')}-${Date.now()}.jpg`
+                    link.download = `step-${stepNum}-${viewingStage.label.toLowerCase().replace(/\s+/g, '-')}-${Date.now()}.${(viewingStage.mime_type || 'image/jpeg').split('/')[1]}`
                     link.click()
                   }}
                   className="btn-primary text-sm px-6"
@@ -4,11 +4,18 @@ Authentication module
 """
 
 from app.auth.jwt import create_access_token, verify_access_token
-from app.auth.password import hash_password, verify_password
+from app.auth.password import (
+    hash_password,
+    verify_password,
+    hash_password_async,
+    verify_password_async,
+)
 
 __all__ = [
     "create_access_token",
     "verify_access_token",
     "hash_password",
     "verify_password",
+    "hash_password_async",
+    "verify_password_async",
 ]
@@ -4,7 +4,11 @@ JWT token generation and validation
 """
 
 import os
-from datetime import datetime, timedelta
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import timedelta
 from typing import Optional
 import jwt
 from app.exceptions import UnauthorizedException
@@ -13,30 +17,78 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Pre-encoded key and frozen algorithm list, reused on every encode/decode
+_SECRET_BYTES = SECRET_KEY.encode()
+_ALGORITHMS = (ALGORITHM,)
+
+# Verified-token cache: blake2b(token) -> (expires_at, payload)
+TOKEN_CACHE_SIZE = 10_000
+_token_cache: "OrderedDict[bytes, tuple[float, dict]]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+
+def _cache_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def _cache_get(key: bytes) -> Optional[dict]:
+    """Return a cached payload if present and not yet expired"""
+    with _token_cache_lock:
+        entry = _token_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            del _token_cache[key]
+            return None
+        _token_cache.move_to_end(key)
+        return payload
+
+
+def _cache_put(key: bytes, payload: dict) -> None:
+    """Cache a verified payload until the earlier of the cache TTL and the token's exp"""
+    expires_at = time.time() + ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        expires_at = min(expires_at, exp)
+    with _token_cache_lock:
+        _token_cache[key] = (expires_at, payload)
+        _token_cache.move_to_end(key)
+        if len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
-    
+
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire_seconds = int(expires_delta.total_seconds())
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+        expire_seconds = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+    to_encode["exp"] = int(time.time()) + expire_seconds
+    encoded_jwt = jwt.encode(to_encode, _SECRET_BYTES, algorithm=ALGORITHM)
     return encoded_jwt
 
 
 def verify_access_token(token: str) -> dict:
     """Verify and decode a JWT access token"""
+    key = _cache_key(token)
+    payload = _cache_get(key)
+    if payload is not None:
+        return payload
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, _SECRET_BYTES, algorithms=_ALGORITHMS)
         user_id: str = payload.get("sub")
         if user_id is None:
             raise UnauthorizedException("Invalid token")
-        return payload
     except jwt.ExpiredSignatureError:
         raise UnauthorizedException("Token has expired")
     except jwt.InvalidTokenError:
         raise UnauthorizedException("Invalid token")
+
+    # Only tokens that passed full verification are cached
+    _cache_put(key, payload)
+    return payload
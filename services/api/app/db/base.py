@@ -3,6 +3,9 @@ services/api/app/db/base.py
 SQLAlchemy base model with common fields
 """
 
+import os
+import time
+import uuid
 from datetime import datetime
 from sqlalchemy import Column, String, DateTime
 from sqlalchemy.orm import declarative_base
@@ -10,10 +13,29 @@ from sqlalchemy.orm import declarative_base
 Base = declarative_base()
 
 
+def uuid7() -> uuid.UUID:
+    """Generate a time-ordered UUIDv7 (48-bit ms timestamp + 74 random bits)"""
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
+def new_id() -> str:
+    """Primary key for new rows; time-ordered so inserts append to the PK index"""
+    return str(uuid7())
+
+
 class BaseModel(Base):
     """Base model with common fields"""
     __abstract__ = True
 
-    id = Column(String, primary_key=True, index=True)
+    id = Column(String, primary_key=True, index=True, default=new_id)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __init__(self, **kwargs):
+        # Assign the id up front so it is usable before the first flush
+        kwargs.setdefault("id", new_id())
+        super().__init__(**kwargs)
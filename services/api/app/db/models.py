@@ -3,13 +3,22 @@ services/api/app/db/models.py
 Database models for SasaSight
 """
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class FrozenModel(BaseModel):
+    """Immutable model; unknown fields are dropped during validation"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
 
 
 # Request/Response Models
-class BoardMetadata(BaseModel):
+class BoardMetadata(FrozenModel):
     manufacturer: Optional[str] = None
     boardRevision: Optional[str] = None
     scanDuration: Optional[int] = None
@@ -18,20 +27,20 @@ class BoardMetadata(BaseModel):
     coverage: Optional[float] = None
 
 
-class BoardRecord(BaseModel):
+class BoardRecord(FrozenModel):
     id: str
     boardId: str
     deviceModel: Optional[str] = None
     side: str  # 'front' or 'back'
     imageUrl: str
     thumbnailUrl: Optional[str] = None
-    createdAt: datetime = Field(default_factory=datetime.utcnow)
+    createdAt: datetime = Field(default_factory=_utcnow)
     createdBy: Optional[str] = None
     notes: Optional[str] = None
     metadata: Optional[BoardMetadata] = None
 
 
-class BoardCreate(BaseModel):
+class BoardCreate(FrozenModel):
     boardId: str
     deviceModel: Optional[str] = None
     side: str
@@ -40,13 +49,13 @@ class BoardCreate(BaseModel):
     metadata: Optional[BoardMetadata] = None
 
 
-class BoardUpdate(BaseModel):
+class BoardUpdate(FrozenModel):
     deviceModel: Optional[str] = None
     notes: Optional[str] = None
     metadata: Optional[BoardMetadata] = None
 
 
-class ScanProgress(BaseModel):
+class ScanProgress(FrozenModel):
     boardSetId: str
     boardId: str
     side: str
@@ -56,12 +65,12 @@ class ScanProgress(BaseModel):
     estimatedQuality: Optional[float] = None
 
 
-class AnnotationPoint(BaseModel):
+class AnnotationPoint(FrozenModel):
     x: float
     y: float
 
 
-class AnnotationObject(BaseModel):
+class AnnotationObject(FrozenModel):
     id: str
     type: str  # 'line', 'arrow', 'rect', 'circle', 'polygon', 'text'
     points: List[AnnotationPoint] = []
@@ -73,7 +82,7 @@ class AnnotationObject(BaseModel):
     createdBy: Optional[str] = None
 
 
-class AnnotationLayer(BaseModel):
+class AnnotationLayer(FrozenModel):
     id: str
     name: str
     visible: bool = True
@@ -82,25 +91,25 @@ class AnnotationLayer(BaseModel):
     opacity: Optional[float] = None
 
 
-class AnnotationDocument(BaseModel):
+class AnnotationDocument(FrozenModel):
     id: str
     boardId: str
     boardSetId: Optional[str] = None
     side: str  # 'front' or 'back'
     layers: List[AnnotationLayer] = []
-    createdAt: datetime = Field(default_factory=datetime.utcnow)
-    updatedAt: datetime = Field(default_factory=datetime.utcnow)
+    createdAt: datetime = Field(default_factory=_utcnow)
+    updatedAt: datetime = Field(default_factory=_utcnow)
     createdBy: Optional[str] = None
     notes: Optional[str] = None
 
 
-class AnnotationCreate(BaseModel):
+class AnnotationCreate(FrozenModel):
     layers: List[AnnotationLayer] = []
     notes: Optional[str] = None
 
 
 # Drawing element model (from frontend canvas)
-class DrawingElement(BaseModel):
+class DrawingElement(FrozenModel):
     tool: str  # 'pen', 'arrow', 'rect', 'circle', 'text', 'eraser'
     color: str = "#06b6d4"
     strokeWidth: int = 2
@@ -113,33 +122,33 @@ class DrawingElement(BaseModel):
     fontSize: Optional[int] = None  # For text tool
 
 
-class DrawingAnnotation(BaseModel):
+class DrawingAnnotation(FrozenModel):
     """Simple drawing annotation format from canvas"""
     boardId: str
     side: str  # 'front' or 'back'
     annotations: List[DrawingElement] = []
-    createdAt: datetime = Field(default_factory=datetime.utcnow)
-    updatedAt: datetime = Field(default_factory=datetime.utcnow)
+    createdAt: datetime = Field(default_factory=_utcnow)
+    updatedAt: datetime = Field(default_factory=_utcnow)
 
 
-class AnnotationUpdate(BaseModel):
+class AnnotationUpdate(FrozenModel):
     layers: Optional[List[AnnotationLayer]] = None
     notes: Optional[str] = None
 
 
-class DetectionResult(BaseModel):
+class DetectionResult(FrozenModel):
     label: str
     confidence: float
     bbox: dict  # {'x': int, 'y': int, 'width': int, 'height': int}
 
 
-class OcrResult(BaseModel):
+class OcrResult(FrozenModel):
     text: str
     confidence: float
     bbox: dict
 
 
-class BoardIdResult(BaseModel):
+class BoardIdResult(FrozenModel):
     boardId: str
     confidence: float
     bounds: dict
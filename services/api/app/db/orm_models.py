@@ -3,12 +3,14 @@ services/api/app/db/orm_models.py
 SQLAlchemy ORM models for database persistence
 """
 
-import uuid
-from datetime import datetime
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Float, Boolean, ForeignKey, Text, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.db.base import BaseModel
 
+# Native JSON document column (JSONB on PostgreSQL), encoded with orjson by the engine
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
 
 class User(BaseModel):
     """User account model"""
@@ -24,15 +26,14 @@ class User(BaseModel):
     scans = relationship("BoardScan", back_populates="user")
     annotations = relationship("Annotation", back_populates="user")
 
-    def __init__(self, **kwargs):
-        if "id" not in kwargs:
-            kwargs["id"] = str(uuid.uuid4())
-        super().__init__(**kwargs)
-
 
 class Board(BaseModel):
     """Board record model"""
     __tablename__ = "boards"
+    __table_args__ = (
+        Index("ix_boards_id_user", "id", "user_id"),
+        Index("ix_boards_board_id_user", "board_id", "user_id"),
+    )
 
     board_id = Column(String, index=True, nullable=False)
     device_model = Column(String, nullable=True)
@@ -53,15 +54,14 @@ class Board(BaseModel):
     scans = relationship("BoardScan", back_populates="board", cascade="all, delete-orphan")
     annotations = relationship("Annotation", back_populates="board", cascade="all, delete-orphan")
 
-    def __init__(self, **kwargs):
-        if "id" not in kwargs:
-            kwargs["id"] = str(uuid.uuid4())
-        super().__init__(**kwargs)
-
 
 class BoardScan(BaseModel):
     """Scan session model"""
     __tablename__ = "board_scans"
+    __table_args__ = (
+        Index("ix_board_scans_board_status", "board_id", "status"),
+        Index("ix_board_scans_id_user", "id", "user_id"),
+    )
 
     board_id = Column(String, ForeignKey("boards.id"), nullable=False)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -78,15 +78,11 @@ class BoardScan(BaseModel):
     user = relationship("User", back_populates="scans")
     frames = relationship("ScanFrame", back_populates="scan", cascade="all, delete-orphan")
 
-    def __init__(self, **kwargs):
-        if "id" not in kwargs:
-            kwargs["id"] = str(uuid.uuid4())
-        super().__init__(**kwargs)
-
 
 class ScanFrame(BaseModel):
     """Individual frame captured during scan"""
     __tablename__ = "scan_frames"
+    __table_args__ = (Index("ix_scan_frames_scan_order", "scan_id", "order"),)
 
     scan_id = Column(String, ForeignKey("board_scans.id"), nullable=False)
     image_path = Column(String, nullable=False)
@@ -99,11 +95,6 @@ class ScanFrame(BaseModel):
     # Relationships
     scan = relationship("BoardScan", back_populates="frames")
 
-    def __init__(self, **kwargs):
-        if "id" not in kwargs:
-            kwargs["id"] = str(uuid.uuid4())
-        super().__init__(**kwargs)
-
 
 class Upload(BaseModel):
     """File upload record"""
@@ -114,30 +105,21 @@ class Upload(BaseModel):
     file_size = Column(Integer, nullable=False)
     mime_type = Column(String, nullable=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=True)
-    upload_metadata = Column(Text, nullable=True)  # JSON string
-
-    def __init__(self, **kwargs):
-        if "id" not in kwargs:
-            kwargs["id"] = str(uuid.uuid4())
-        super().__init__(**kwargs)
+    upload_metadata = Column(JSONDocument, nullable=True)
 
 
 class Annotation(BaseModel):
     """Annotation document with layers and objects"""
     __tablename__ = "annotations"
+    __table_args__ = (Index("ix_annotations_board_side_ver", "board_id", "side", "version"),)
 
     board_id = Column(String, ForeignKey("boards.id"), nullable=False)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     side = Column(String, nullable=False)  # 'front' or 'back'
     version = Column(Integer, default=1)
     notes = Column(Text, nullable=True)
-    data = Column(Text, nullable=True)  # JSON string storing layers and objects
+    data = Column(JSONDocument, nullable=True)  # Layers and objects
 
     # Relationships
     board = relationship("Board", back_populates="annotations")
     user = relationship("User", back_populates="annotations")
-
-    def __init__(self, **kwargs):
-        if "id" not in kwargs:
-            kwargs["id"] = str(uuid.uuid4())
-        super().__init__(**kwargs)
@@ -4,9 +4,10 @@ Database session configuration
 """
 
 import os
-from sqlalchemy import create_engine
+import orjson
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool, StaticPool
 
 # Database URL from environment or use SQLite for development
 DATABASE_URL = os.getenv(
@@ -14,15 +15,58 @@ DATABASE_URL = os.getenv(
     "sqlite:///./sasasight.db"  # SQLite for dev, switch to PostgreSQL in prod
 )
 
+# Compiled-statement cache entries per engine (SQLAlchemy's default is 500)
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1200"))
+
+# Applied to every new SQLite connection: WAL lets readers run alongside a
+# writer, mmap serves hot pages without read() syscalls, 64 MiB page cache
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+
+
+
+def _json_serializer(value) -> str:
+    """Serialize JSON columns with orjson (SQLAlchemy expects str)"""
+    return orjson.dumps(value).decode()
+
+
+engine_kwargs = {
+    "json_serializer": _json_serializer,
+    "json_deserializer": orjson.loads,
+    "query_cache_size": QUERY_CACHE_SIZE,
+}
+
 # Check if using SQLite
 if DATABASE_URL.startswith("sqlite"):
+    if ":memory:" in DATABASE_URL or DATABASE_URL in ("sqlite://", "sqlite:///"):
+        # In-memory databases exist per connection, so share a single one
+        pool_kwargs = {"poolclass": StaticPool}
+    else:
+        # File-backed WAL databases allow concurrent readers across threads
+        pool_kwargs = {"poolclass": QueuePool, "pool_size": 8, "max_overflow": 16}
+
     engine = create_engine(
         DATABASE_URL,
         connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
+        **pool_kwargs,
+        **engine_kwargs,
     )
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in SQLITE_PRAGMAS:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
 else:
-    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+    engine = create_engine(DATABASE_URL, pool_pre_ping=True, **engine_kwargs)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
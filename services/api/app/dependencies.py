@@ -34,7 +34,7 @@ async def get_current_user(
         raise UnauthorizedException("Invalid token")
 
     # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise UnauthorizedException("User not found")
 
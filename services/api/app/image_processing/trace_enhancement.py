@@ -1,13 +1,46 @@
 import cv2
+import lz4.frame
 import numpy as np
 from PIL import Image
 import logging
 import base64
+import functools
 from io import BytesIO
-from typing import List, Dict, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
+# Independent OpenCV branches run here concurrently (OpenCV releases the GIL)
+_BRANCH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="trace-branch")
+
+
+class _InlineExecutor:
+    """Executor stand-in that runs each submitted call immediately"""
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def run_branches_inline() -> None:
+    """Run pipeline branches sequentially in the calling thread
+
+    For worker processes that already run one job per core, where branch
+    threads would only oversubscribe the CPU.
+    """
+    global _BRANCH_POOL
+    if isinstance(_BRANCH_POOL, ThreadPoolExecutor):
+        _BRANCH_POOL.shutdown(wait=False)
+    _BRANCH_POOL = _InlineExecutor()
+
+# Longest side of stage preview images sent to the frontend
+PREVIEW_MAX_SIZE = 1024
+
 class ProcessingStage:
     """Represents a single stage in the trace processing pipeline"""
     def __init__(self, label: str, description: str, image_array: np.ndarray, is_grayscale: bool = True):
@@ -16,26 +49,62 @@ class ProcessingStage:
         self.image_array = image_array
         self.is_grayscale = is_grayscale
     
+    @functools.cached_property
+    def is_mask(self) -> bool:
+        """Binary (0/255) single-channel stages (masks, edge maps) are encoded
+        losslessly; continuous-tone grayscale goes out as lossy WebP"""
+        if not self.is_grayscale or self.image_array.ndim != 2:
+            return False
+        return cv2.countNonZero(cv2.inRange(self.image_array, 1, 254)) == 0
+
+    @property
+    def mime_type(self) -> str:
+        return "image/png" if self.is_mask else "image/webp"
+
     def to_base64(self) -> str:
-        """Convert image to base64 string"""
-        if self.is_grayscale and len(self.image_array.shape) == 2:
-            pil_img = Image.fromarray(self.image_array)
+        """Convert image to a base64 preview (PNG for masks, WebP otherwise)"""
+        if self.is_mask:
+            pil_img = Image.fromarray(self.image_array, mode="L")
         else:
             if len(self.image_array.shape) == 3:
                 pil_img = Image.fromarray(cv2.cvtColor(self.image_array, cv2.COLOR_BGR2RGB))
             else:
                 pil_img = Image.fromarray(self.image_array)
-        
+
+        if max(pil_img.size) > PREVIEW_MAX_SIZE:
+            # Nearest-neighbour keeps masks strictly 0/255
+            resample = Image.Resampling.NEAREST if self.is_mask else Image.Resampling.LANCZOS
+            pil_img.thumbnail((PREVIEW_MAX_SIZE, PREVIEW_MAX_SIZE), resample)
+
         buffered = BytesIO()
-        pil_img.save(buffered, format="JPEG", quality=85)
+        if self.is_mask:
+            # 1-bit PNG: an eighth of the raw size before deflate
+            pil_img.convert("1", dither=Image.Dither.NONE).save(buffered, format="PNG", optimize=False)
+        else:
+            pil_img.save(buffered, format="WEBP", quality=80, method=4)
         return base64.b64encode(buffered.getvalue()).decode('utf-8')
     
+    def to_binary(self) -> bytes:
+        """Raw uint8 pixels (BGR for color stages), LZ4 frame-compressed"""
+        return lz4.frame.compress(np.ascontiguousarray(self.image_array).tobytes(), compression_level=1)
+
+    def to_binary_dict(self) -> Dict:
+        """Convert to dictionary for the msgpack transport"""
+        return {
+            'label': self.label,
+            'description': self.description,
+            'shape': list(self.image_array.shape),
+            'dtype': str(self.image_array.dtype),
+            'data': self.to_binary(),
+        }
+    
     def to_dict(self) -> Dict:
         """Convert to dictionary"""
         return {
             'label': self.label,
             'description': self.description,
-            'image_base64': self.to_base64()
+            'image_base64': self.to_base64(),
+            'mime_type': self.mime_type,
         }
 
 
@@ -71,8 +140,23 @@ class TraceEnhancer:
             # Metallic/Silver
             'metallic': ((0, 0, 150), (180, 50, 255))
         }
-        
-        self.stages: List[ProcessingStage] = []
+
+        # Range bounds as (N, 3) uint8 arrays, built once instead of per call
+        self._color_names = list(self.component_colors)
+        self._lows = np.asarray([lo for lo, _ in self.component_colors.values()], dtype=np.uint8)
+        self._highs = np.asarray([hi for _, hi in self.component_colors.values()], dtype=np.uint8)
+
+        # Morphology kernels shared by every call
+        self._kernel2 = cv2.getStructuringElement(cv2.MORPH_RECT, (2, 2))
+        self._kernel3 = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+        self._kernel7 = cv2.getStructuringElement(cv2.MORPH_RECT, (7, 7))
+
+        # Separable 5x5 Gaussian (sigma derived from size), applied as two 1-D passes
+        self._gauss5 = cv2.getGaussianKernel(5, 0)
+
+    def blur(self, gray: np.ndarray) -> np.ndarray:
+        """5x5 Gaussian blur of a grayscale image via sepFilter2D with the cached kernel"""
+        return cv2.sepFilter2D(gray, cv2.CV_8U, self._gauss5, self._gauss5)
 
     def preprocess(self, image: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
@@ -82,19 +166,33 @@ class TraceEnhancer:
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         
         # Blur to reduce noise
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        blurred = self.blur(gray)
         
+        return self.detect_traces(blurred)
+
+    def detect_traces(self, blurred: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Run adaptive thresholding, Otsu thresholding and Canny concurrently on a blurred grayscale image.
+        Returns: (binary_adaptive, binary_otsu, edges)
+        """
         # Adaptive Thresholding
-        thresh_adaptive = cv2.adaptiveThreshold(
-            blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
+        adaptive_future = _BRANCH_POOL.submit(
+            cv2.adaptiveThreshold,
+            blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
             cv2.THRESH_BINARY_INV, 19, 9
         )
         
         # Otsu's Thresholding
-        _, thresh_otsu = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        otsu_future = _BRANCH_POOL.submit(
+            cv2.threshold, blurred, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU
+        )
         
         # Canny Edge Detection
-        edges = cv2.Canny(blurred, 50, 150)
+        edges_future = _BRANCH_POOL.submit(cv2.Canny, blurred, 50, 150)
+        
+        thresh_adaptive = adaptive_future.result()
+        _, thresh_otsu = otsu_future.result()
+        edges = edges_future.result()
         
         logger.info("✅ Preprocessing complete: adaptive threshold, Otsu threshold, and Canny edges")
         
@@ -105,20 +203,16 @@ class TraceEnhancer:
         """
         Combine multiple trace detection methods and enhance with morphological operations.
         """
-        # Combine all methods: adaptive + Otsu + Canny edges
-        combined = cv2.bitwise_or(binary_adaptive, binary_otsu)
-        combined = cv2.bitwise_or(combined, edges)
+        # Combine all methods: adaptive + Otsu + Canny edges (one buffer reused throughout)
+        enhanced = cv2.bitwise_or(binary_adaptive, binary_otsu)
+        cv2.bitwise_or(enhanced, edges, dst=enhanced)
         
         # Morphological operations to connect broken lines and thicken traces
-        kernel_dilate = np.ones((3, 3), np.uint8)
-        dilated = cv2.dilate(combined, kernel_dilate, iterations=2)
-        
-        kernel_erode = np.ones((2, 2), np.uint8)
-        eroded = cv2.erode(dilated, kernel_erode, iterations=1)
+        cv2.dilate(enhanced, self._kernel3, dst=enhanced, iterations=2)
+        cv2.erode(enhanced, self._kernel2, dst=enhanced, iterations=1)
         
         # Final close operation to fill small holes
-        kernel_close = np.ones((3, 3), np.uint8)
-        enhanced = cv2.morphologyEx(eroded, cv2.MORPH_CLOSE, kernel_close)
+        cv2.morphologyEx(enhanced, cv2.MORPH_CLOSE, self._kernel3, dst=enhanced)
         
         logger.info("✅ Trace enhancement complete: combined methods + morphology")
         
@@ -130,20 +224,17 @@ class TraceEnhancer:
         """
         hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
         mask_combined = np.zeros(image.shape[:2], dtype=np.uint8)
+        mask = np.empty_like(mask_combined)  # reused by every range
         
         component_count = {}
         
-        for name, (lower, upper) in self.component_colors.items():
-            lower_np = np.array(lower, dtype=np.uint8)
-            upper_np = np.array(upper, dtype=np.uint8)
-            mask = cv2.inRange(hsv, lower_np, upper_np)
-            detected_pixels = cv2.countNonZero(mask)
-            component_count[name] = detected_pixels
-            mask_combined = cv2.bitwise_or(mask_combined, mask)
+        for i, name in enumerate(self._color_names):
+            cv2.inRange(hsv, self._lows[i], self._highs[i], dst=mask)
+            component_count[name] = cv2.countNonZero(mask)
+            cv2.bitwise_or(mask_combined, mask, dst=mask_combined)
         
         # Dilate mask to ensure full component coverage
-        kernel = np.ones((7, 7), np.uint8)
-        mask_combined = cv2.dilate(mask_combined, kernel, iterations=2)
+        cv2.dilate(mask_combined, self._kernel7, dst=mask_combined, iterations=2)
         
         logger.info(f"✅ Component suppression: detected {len([v for v in component_count.values() if v > 0])} component types")
         
@@ -176,26 +267,34 @@ class TraceEnhancer:
         
         return cv2.bitwise_and(colored_traces, colored_traces, mask=trace_mask)
 
-    def process_with_stages(self, image_pil: Image.Image, 
+    def process_with_stages(self, image: Union[Image.Image, np.ndarray], 
                            return_stages: bool = True) -> Tuple[Image.Image, List[ProcessingStage]]:
         """
         Main trace detection pipeline with processing stage tracking.
+        `image` is a PIL image or a BGR array (as returned by cv2.imdecode).
         Returns: (final_image, processing_stages)
+
+        Stages are collected per call, so one shared enhancer can serve
+        concurrent requests.
         """
-        self.stages = []
+        stages: List[ProcessingStage] = []
         
         try:
-            # Convert PIL to cv2
-            image_np = np.array(image_pil)
-            
-            # Handle RGBA images
-            if len(image_np.shape) == 3 and image_np.shape[2] == 4:
-                image_np = cv2.cvtColor(image_np, cv2.COLOR_RGBA2BGR)
+            if isinstance(image, np.ndarray):
+                # Already BGR, no conversion needed
+                image_np = image
             else:
-                image_np = cv2.cvtColor(image_np, cv2.COLOR_RGB2BGR)
+                # Convert PIL to cv2
+                image_np = np.array(image)
+                
+                # Handle RGBA images
+                if len(image_np.shape) == 3 and image_np.shape[2] == 4:
+                    image_np = cv2.cvtColor(image_np, cv2.COLOR_RGBA2BGR)
+                else:
+                    image_np = cv2.cvtColor(image_np, cv2.COLOR_RGB2BGR)
             
             if return_stages:
-                self.stages.append(ProcessingStage(
+                stages.append(ProcessingStage(
                     "Original (Trace Detection)",
                     "Original PCB image for trace analysis",
                     image_np,
@@ -204,33 +303,35 @@ class TraceEnhancer:
             
             # Convert to grayscale
             gray = cv2.cvtColor(image_np, cv2.COLOR_BGR2GRAY)
-            blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+            blurred = self.blur(gray)
             
             if return_stages:
-                self.stages.append(ProcessingStage(
+                stages.append(ProcessingStage(
                     "Preprocessed (Blur)",
                     "Gaussian blur applied to reduce noise",
                     blurred,
                     is_grayscale=True
                 ))
             
-            # 1. Preprocessing (dual thresholding + Canny)
-            thresh_adaptive, thresh_otsu, edges = self.preprocess(image_np)
+            # 1. Preprocessing (dual thresholding + Canny), with component
+            # detection running alongside since it only needs the color image
+            component_future = _BRANCH_POOL.submit(self.suppress_components, image_np)
+            thresh_adaptive, thresh_otsu, edges = self.detect_traces(blurred)
             
             if return_stages:
-                self.stages.append(ProcessingStage(
+                stages.append(ProcessingStage(
                     "Traces (Adaptive Threshold)",
                     "Adaptive thresholding highlights traces",
                     thresh_adaptive,
                     is_grayscale=True
                 ))
-                self.stages.append(ProcessingStage(
+                stages.append(ProcessingStage(
                     "Traces (Otsu Threshold)",
                     "Otsu's automatic thresholding method",
                     thresh_otsu,
                     is_grayscale=True
                 ))
-                self.stages.append(ProcessingStage(
+                stages.append(ProcessingStage(
                     "Traces (Canny Edges)",
                     "Canny edge detection for trace boundaries",
                     edges,
@@ -238,10 +339,10 @@ class TraceEnhancer:
                 ))
             
             # 2. Component Detection
-            component_mask = self.suppress_components(image_np)
+            component_mask = component_future.result()
             
             if return_stages:
-                self.stages.append(ProcessingStage(
+                stages.append(ProcessingStage(
                     "Component Mask",
                     "HSV-based detection of component colors (black, blue, green, brown, etc.)",
                     component_mask,
@@ -252,7 +353,7 @@ class TraceEnhancer:
             enhanced_trace_mask = self.enhance_traces(thresh_adaptive, thresh_otsu, edges)
             
             if return_stages:
-                self.stages.append(ProcessingStage(
+                stages.append(ProcessingStage(
                     "Traces (Enhanced)",
                     "Combined trace detection with morphological enhancement",
                     enhanced_trace_mask,
@@ -263,7 +364,7 @@ class TraceEnhancer:
             inpainted = self.inpaint_components(image_np, component_mask)
             
             if return_stages:
-                self.stages.append(ProcessingStage(
+                stages.append(ProcessingStage(
                     "Inpainted (Components Removed)",
                     "Components removed and areas filled with inpainting",
                     inpainted,
@@ -275,24 +376,21 @@ class TraceEnhancer:
             final_trace_mask = cv2.bitwise_and(enhanced_trace_mask, enhanced_trace_mask, mask=safe_area_mask)
             
             if return_stages:
-                self.stages.append(ProcessingStage(
+                stages.append(ProcessingStage(
                     "Traces (Component-Free)",
                     "Traces isolated without component interference",
                     final_trace_mask,
                     is_grayscale=True
                 ))
             
-            # 6. Assembly - Create colored trace overlay (Blue)
-            base_layer = (image_np * 0.5).astype(np.uint8)
-            colored_traces_blue = self.apply_trace_color(image_np.shape, final_trace_mask, color=(255, 0, 0))
-            
-            final_output_blue = base_layer.copy()
-            trace_indices = np.where(final_trace_mask > 0)
-            final_output_blue[trace_indices] = colored_traces_blue[trace_indices]
+            # 6. Assembly - Create colored trace overlay (Blue) in one pass:
+            # trace pixels become blue, the rest is the image at half brightness
+            trace_color = np.array((255, 0, 0), dtype=np.uint8)
+            final_output_blue = np.where(final_trace_mask[..., None] > 0, trace_color, image_np >> 1)
             final_output_blue = cv2.GaussianBlur(final_output_blue, (3, 3), 0)
             
             if return_stages:
-                self.stages.append(ProcessingStage(
+                stages.append(ProcessingStage(
                     "Output (Blue Trace Overlay)",
                     "Final visualization with blue traces overlaid on PCB",
                     final_output_blue,
@@ -302,18 +400,18 @@ class TraceEnhancer:
             # Convert back to PIL
             output_pil = Image.fromarray(cv2.cvtColor(final_output_blue, cv2.COLOR_BGR2RGB))
             
-            logger.info(f"✅ Trace processing complete: {len(self.stages)} stages captured")
+            logger.info(f"✅ Trace processing complete: {len(stages)} stages captured")
             
-            return output_pil, self.stages
+            return output_pil, stages
         
         except Exception as e:
             logger.error(f"❌ Error in trace processing: {str(e)}")
             raise
 
-    def process(self, image_pil: Image.Image) -> Image.Image:
+    def process(self, image: Union[Image.Image, np.ndarray]) -> Image.Image:
         """
         Legacy method for backward compatibility - returns only final image.
         """
-        result, _ = self.process_with_stages(image_pil, return_stages=False)
+        result, _ = self.process_with_stages(image, return_stages=False)
         return result
 
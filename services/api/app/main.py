@@ -4,11 +4,14 @@ FastAPI application entry point
 """
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
+import os
+import anyio.to_thread
 
-from app.routers import boards, uploads, inference, annotations, health, auth, scans
+from app.routers import boards, uploads, inference, annotations, health, auth, scans, traces
 from app.db import Base, engine
 from app.middleware import LoggingMiddleware
 
@@ -19,17 +22,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Worker threads available to sync dependencies and offloaded CPU work (bcrypt)
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "64"))
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("SasaSight API starting up...")
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
     # Create database tables
     Base.metadata.create_all(bind=engine)
     logger.info("Database tables initialized")
+    traces.start_trace_pool()
     yield
     # Shutdown
     logger.info("SasaSight API shutting down...")
+    traces.shutdown_trace_pool()
 
 
 # Create FastAPI app
@@ -38,6 +47,7 @@ app = FastAPI(
     description="Backend API for SasaSight board repair assistant",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS
@@ -60,7 +70,6 @@ app.include_router(uploads.router, prefix="/api", tags=["uploads"])
 app.include_router(inference.router, prefix="/api", tags=["inference"])
 app.include_router(annotations.router, prefix="/api", tags=["annotations"])
 app.include_router(scans.router, tags=["scans"])
-from app.routers import traces
 app.include_router(traces.router)
 
 
@@ -3,37 +3,41 @@ services/api/app/middleware/logging.py
 Request/response logging middleware
 """
 
-import time
 import logging
+import os
+from time import perf_counter_ns
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
 
 logger = logging.getLogger(__name__)
 
+# Opt-in debug header; off by default so production responses skip the write
+EXPOSE_TIMING_HEADER = os.getenv("EXPOSE_TIMING_HEADER", "false").lower() in ("1", "true", "yes")
+
 
 class LoggingMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         # Start timer
-        start_time = time.time()
-
-        # Get request info
-        method = request.method
-        path = request.url.path
-        client_ip = request.client.host if request.client else "unknown"
+        start_ns = perf_counter_ns()
 
         # Call next middleware/route
         response = await call_next(request)
 
-        # Calculate duration
-        duration = time.time() - start_time
+        # Calculate duration (monotonic clock, integer nanoseconds)
+        duration = (perf_counter_ns() - start_ns) / 1e9
 
-        # Log the request
-        logger.info(
-            f"{method} {path} - {response.status_code} - "
-            f"{duration:.3f}s - {client_ip}"
-        )
+        # Log the request, reading request info straight from the ASGI scope
+        if logger.isEnabledFor(logging.INFO):
+            scope = request.scope
+            client = scope.get("client")
+            logger.info(
+                "%s %s - %d - %.3fs - %s",
+                scope["method"], scope["path"], response.status_code, duration,
+                client[0] if client else "unknown",
+            )
 
         # Add response header with duration
-        response.headers["X-Process-Time"] = str(duration)
+        if EXPOSE_TIMING_HEADER and response.status_code >= 200:
+            response.headers["X-Process-Time"] = f"{duration:.6f}"
 
         return response
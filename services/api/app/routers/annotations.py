@@ -3,30 +3,25 @@ services/api/app/routers/annotations.py
 Annotation endpoints
 """
 
-from fastapi import APIRouter, HTTPException
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Request, Response
+from datetime import datetime, timezone
 import uuid
-from app.db.models import AnnotationDocument, AnnotationCreate, AnnotationUpdate, DrawingAnnotation, DrawingElement
+from app.db.models import AnnotationDocument, AnnotationCreate, AnnotationUpdate, DrawingAnnotation
 
 router = APIRouter()
 
-# In-memory storage (replace with real database)
-annotations_db: dict[str, dict[str, AnnotationDocument]] = {}
+_UTC = timezone.utc
+
+# In-memory storage keyed by (board_id, side) (replace with real database)
+annotations_db: dict[tuple[str, str], AnnotationDocument] = {}
 # Simple drawing annotations storage
-drawing_annotations_db: dict[str, dict[str, DrawingAnnotation]] = {}
+drawing_annotations_db: dict[tuple[str, str], DrawingAnnotation] = {}
 
 
 @router.get("/boards/{board_id}/annotations/{side}")
 async def get_annotations(board_id: str, side: str):
     """Get annotations for a specific board side"""
-    if board_id not in annotations_db:
-        return {
-            "boardId": board_id,
-            "side": side,
-            "annotation": None,
-        }
-
-    annotation = annotations_db[board_id].get(side)
+    annotation = annotations_db.get((board_id, side))
     return {
         "boardId": board_id,
         "side": side,
@@ -37,11 +32,10 @@ async def get_annotations(board_id: str, side: str):
 @router.post("/boards/{board_id}/annotations/{side}")
 async def save_annotations(board_id: str, side: str, data: AnnotationCreate):
     """Save annotations for a board side"""
-    annotation_id = str(uuid.uuid4())
-    now = datetime.utcnow()
+    now = datetime.now(_UTC)
 
     annotation = AnnotationDocument(
-        id=annotation_id,
+        id=uuid.uuid4().hex,
         boardId=board_id,
         side=side,
         layers=data.layers,
@@ -50,38 +44,37 @@ async def save_annotations(board_id: str, side: str, data: AnnotationCreate):
         notes=data.notes,
     )
 
-    if board_id not in annotations_db:
-        annotations_db[board_id] = {}
-
-    annotations_db[board_id][side] = annotation
+    annotations_db[(board_id, side)] = annotation
     return annotation
 
 
 @router.put("/boards/{board_id}/annotations/{side}")
 async def update_annotations(board_id: str, side: str, data: AnnotationUpdate):
     """Update annotations for a board side"""
-    if board_id not in annotations_db or side not in annotations_db[board_id]:
+    annotation = annotations_db.get((board_id, side))
+    if annotation is None:
         raise HTTPException(status_code=404, detail="Annotations not found")
 
-    annotation = annotations_db[board_id][side]
-    update_data = data.dict(exclude_unset=True)
-
-    for field, value in update_data.items():
-        if value is not None:
-            setattr(annotation, field, value)
+    # Fields the client sent with a value; read from the model rather than
+    # model_dump() so nested layers stay validated models in the stored copy
+    update_data = {
+        field: value
+        for field in data.model_fields_set
+        if (value := getattr(data, field)) is not None
+    }
+    update_data["updatedAt"] = datetime.now(_UTC)
 
-    annotation.updatedAt = datetime.utcnow()
-    annotations_db[board_id][side] = annotation
+    annotation = annotation.model_copy(update=update_data)
+    annotations_db[(board_id, side)] = annotation
     return annotation
 
 
 @router.delete("/boards/{board_id}/annotations/{side}")
 async def delete_annotations(board_id: str, side: str):
     """Delete annotations for a board side"""
-    if board_id not in annotations_db or side not in annotations_db[board_id]:
+    if annotations_db.pop((board_id, side), None) is None:
         raise HTTPException(status_code=404, detail="Annotations not found")
 
-    del annotations_db[board_id][side]
     return {"status": "deleted"}
 
 
@@ -89,8 +82,7 @@ async def delete_annotations(board_id: str, side: str):
 @router.post("/boards/{board_id}/drawings/{side}")
 async def save_drawing_annotations(board_id: str, side: str, data: DrawingAnnotation):
     """Save drawing annotations for a board side"""
-    annotation_id = str(uuid.uuid4())
-    now = datetime.utcnow()
+    now = datetime.now(_UTC)
 
     annotation = DrawingAnnotation(
         boardId=board_id,
@@ -100,23 +92,23 @@ async def save_drawing_annotations(board_id: str, side: str, data: DrawingAnnota
         updatedAt=now,
     )
 
-    if board_id not in drawing_annotations_db:
-        drawing_annotations_db[board_id] = {}
-
-    drawing_annotations_db[board_id][side] = annotation
+    drawing_annotations_db[(board_id, side)] = annotation
     return {
         "status": "saved",
         "boardId": board_id,
         "side": side,
         "count": len(data.annotations),
-        "savedAt": now.isoformat(),
+        "savedAt": now,
     }
 
 
 @router.get("/boards/{board_id}/drawings/{side}")
-async def get_drawing_annotations(board_id: str, side: str):
+async def get_drawing_annotations(
+    board_id: str, side: str, request: Request, response: Response
+):
     """Get drawing annotations for a specific board side"""
-    if board_id not in drawing_annotations_db or side not in drawing_annotations_db[board_id]:
+    annotation = drawing_annotations_db.get((board_id, side))
+    if annotation is None:
         return {
             "boardId": board_id,
             "side": side,
@@ -124,13 +116,19 @@ async def get_drawing_annotations(board_id: str, side: str):
             "found": False,
         }
 
-    annotation = drawing_annotations_db[board_id][side]
+    # Every save replaces the document, so updatedAt identifies its version;
+    # polling clients revalidate with If-None-Match instead of refetching
+    etag = f'"{int(annotation.updatedAt.timestamp() * 1_000_000):x}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
     return {
         "boardId": board_id,
         "side": side,
         "annotations": annotation.annotations,
-        "createdAt": annotation.createdAt.isoformat(),
-        "updatedAt": annotation.updatedAt.isoformat(),
+        "createdAt": annotation.createdAt,
+        "updatedAt": annotation.updatedAt,
         "found": True,
     }
 
@@ -138,8 +136,7 @@ async def get_drawing_annotations(board_id: str, side: str):
 @router.delete("/boards/{board_id}/drawings/{side}")
 async def delete_drawing_annotations(board_id: str, side: str):
     """Delete drawing annotations for a board side"""
-    if board_id not in drawing_annotations_db or side not in drawing_annotations_db[board_id]:
+    if drawing_annotations_db.pop((board_id, side), None) is None:
         raise HTTPException(status_code=404, detail="Annotations not found")
 
-    del drawing_annotations_db[board_id][side]
     return {"status": "deleted", "boardId": board_id, "side": side}
@@ -3,67 +3,93 @@ services/api/app/routers/auth.py
 Authentication endpoints (register, login, refresh token)
 """
 
-import uuid
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import insert, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict
 
-from app.db import get_db, User, SessionLocal
-from app.auth import create_access_token, hash_password, verify_password
+from app.db import get_db, User
+from app.db.base import new_id
+from app.auth import create_access_token, hash_password_async, verify_password_async
 from app.exceptions import ValidationException, UnauthorizedException
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+# INSERT constructs supporting ON CONFLICT DO NOTHING, per database dialect;
+# other dialects fall back to _insert_user_checked
+_INSERT_BY_DIALECT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _insert_user_checked(db: Session, values: dict) -> bool:
+    """Select-then-insert for dialects without ON CONFLICT; False on a duplicate"""
+    existing = db.scalar(select(User.id).where(
+        or_(User.username == values["username"], User.email == values["email"])
+    ))
+    if existing is not None:
+        return False
+    db.execute(insert(User).values(**values))
+    return True
+
 
 class UserRegister(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     username: str
     email: str
     password: str
 
 
 class UserLogin(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     username: str
     password: str
 
 
 class Token(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     access_token: str
     token_type: str = "bearer"
 
 
 class UserOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     id: str
     username: str
     email: str
 
-    class Config:
-        from_attributes = True
-
 
 @router.post("/register", response_model=UserOut)
 async def register(user_data: UserRegister, db: Session = Depends(get_db)):
     """Register a new user"""
-    # Check if user already exists
-    existing_user = db.query(User).filter(
-        (User.username == user_data.username) | (User.email == user_data.email)
-    ).first()
+    user_id = new_id()
+    hashed_password = await hash_password_async(user_data.password)
 
-    if existing_user:
-        raise ValidationException("User with this username or email already exists")
-
-    # Create new user
-    new_user = User(
-        id=str(uuid.uuid4()),
-        username=user_data.username,
-        email=user_data.email,
-        hashed_password=hash_password(user_data.password),
-    )
+    values = {
+        "id": user_id,
+        "username": user_data.username,
+        "email": user_data.email,
+        "hashed_password": hashed_password,
+    }
 
+    dialect_insert = _INSERT_BY_DIALECT.get(db.get_bind().dialect.name)
     try:
-        db.add(new_user)
+        if dialect_insert is not None:
+            # Single round-trip: the unique username/email indexes reject duplicates,
+            # which also closes the race between a separate existence check and insert
+            stmt = dialect_insert(User).values(**values).on_conflict_do_nothing()
+            created = db.execute(stmt).rowcount > 0
+        else:
+            created = _insert_user_checked(db, values)
         db.commit()
-        db.refresh(new_user)
-        return new_user
+    except IntegrityError:
+        # A concurrent registration got past the existence check first
+        db.rollback()
+        created = False
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -71,13 +97,22 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
             detail="Failed to create user"
         )
 
+    if not created:
+        raise ValidationException("User with this username or email already exists")
+
+    return {"id": user_id, "username": user_data.username, "email": user_data.email}
+
 
 @router.post("/login", response_model=Token)
 async def login(user_data: UserLogin, db: Session = Depends(get_db)):
     """Login with username and password"""
-    user = db.query(User).filter(User.username == user_data.username).first()
+    user = db.scalars(select(User).where(User.username == user_data.username)).first()
 
-    if not user or not verify_password(user_data.password, user.hashed_password):
+    # Verify even when the user is missing so both failures take the same time
+    password_ok = await verify_password_async(
+        user_data.password, user.hashed_password if user else None
+    )
+    if not user or not password_ok:
         raise UnauthorizedException("Invalid username or password")
 
     if not user.is_active:
@@ -100,7 +135,8 @@ async def get_current_user(token: str, db: Session = Depends(get_db)):
     payload = verify_access_token(token)
     user_id = payload.get("sub")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    # Primary-key lookup; served from the identity map when already loaded
+    user = db.get(User, user_id)
     if not user:
         raise UnauthorizedException("User not found")
 
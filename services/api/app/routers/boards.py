@@ -3,20 +3,23 @@ services/api/app/routers/boards.py
 Board endpoints with database persistence
 """
 
-import uuid
 from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, TypeAdapter
 
-from app.db import get_db, Board, BoardScan as ScanModel, ScanFrame
+from app.db import get_db, Board, BoardScan as ScanModel
 from app.dependencies import get_current_user
 from app.db.orm_models import User
 from app.exceptions import BoardNotFound
 
 # Pydantic models for API
 class BoardMetadata(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     manufacturer: Optional[str] = None
     boardRevision: Optional[str] = None
     scanDuration: Optional[int] = None
@@ -26,6 +29,8 @@ class BoardMetadata(BaseModel):
 
 
 class BoardCreate(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     boardId: str
     deviceModel: Optional[str] = None
     side: str  # 'front' or 'back'
@@ -35,27 +40,39 @@ class BoardCreate(BaseModel):
 
 
 class BoardUpdate(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     deviceModel: Optional[str] = None
     notes: Optional[str] = None
     metadata: Optional[BoardMetadata] = None
 
 
+def _orm_alias(column: str, name: str) -> Field:
+    """Accept both the ORM column name and the API field name on validation"""
+    return Field(validation_alias=AliasChoices(column, name))
+
+
 class BoardOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     id: str
-    boardId: str
-    deviceModel: Optional[str]
+    boardId: str = _orm_alias("board_id", "boardId")
+    deviceModel: Optional[str] = _orm_alias("device_model", "deviceModel")
     side: str
-    imageUrl: str
-    thumbnailUrl: Optional[str]
-    createdAt: datetime
-    createdBy: Optional[str]
+    imageUrl: Optional[str] = _orm_alias("image_url", "imageUrl")
+    thumbnailUrl: Optional[str] = _orm_alias("thumbnail_url", "thumbnailUrl")
+    createdAt: datetime = _orm_alias("created_at", "createdAt")
+    createdBy: Optional[str] = _orm_alias("created_by", "createdBy")
     notes: Optional[str]
 
-    class Config:
-        from_attributes = True
+
+# Serializes a whole page of boards in one pass through pydantic-core
+_BoardListAdapter = TypeAdapter(List[BoardOut])
 
 
 class ScanProgress(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     boardSetId: str
     boardId: str
     side: str
@@ -78,19 +95,35 @@ async def list_boards(
     current_user: User = Depends(get_current_user),
 ):
     """List all boards for current user with optional filters"""
-    query = db.query(Board).filter(Board.user_id == current_user.id)
-
+    filters = [Board.user_id == current_user.id]
     if device_model:
-        query = query.filter(Board.device_model == device_model)
+        filters.append(Board.device_model == device_model)
     if board_id:
-        query = query.filter(Board.board_id == board_id)
+        filters.append(Board.board_id == board_id)
+
+    # The window count rides along with the page, so one round-trip serves both
+    stmt = (
+        select(Board, func.count().over().label("_total"))
+        .where(*filters)
+        .offset(skip)
+        .limit(limit)
+    )
+    rows = db.execute(stmt).all()
+    boards = [row[0] for row in rows]
 
-    total = query.count()
-    boards = query.offset(skip).limit(limit).all()
+    if rows:
+        total = rows[0]._total
+    elif skip:
+        # Paged past the end: no row carries the count, so fetch it directly
+        total = db.scalar(select(func.count()).select_from(Board).where(*filters))
+    else:
+        total = 0
 
     return {
         "total": total,
-        "items": [BoardOut.from_orm(b).dict() for b in boards],
+        "items": _BoardListAdapter.dump_python(
+            _BoardListAdapter.validate_python(boards), mode="json"
+        ),
     }
 
 
@@ -101,14 +134,14 @@ async def get_board(
     current_user: User = Depends(get_current_user),
 ):
     """Get a specific board"""
-    board = db.query(Board).filter(
-        (Board.id == board_id) & (Board.user_id == current_user.id)
+    board = db.scalars(
+        select(Board).where(Board.id == board_id, Board.user_id == current_user.id)
     ).first()
 
     if not board:
         raise BoardNotFound(board_id)
 
-    return BoardOut.from_orm(board)
+    return BoardOut.model_validate(board)
 
 
 @router.post("/boards", response_model=BoardOut, status_code=status.HTTP_201_CREATED)
@@ -119,7 +152,6 @@ async def create_board(
 ):
     """Create a new board record"""
     board = Board(
-        id=str(uuid.uuid4()),
         board_id=data.boardId,
         device_model=data.deviceModel,
         side=data.side,
@@ -133,10 +165,13 @@ async def create_board(
     )
 
     try:
+        # Flush assigns the id/timestamp defaults; build the response before
+        # commit expires the instance, so no refresh SELECT is needed
         db.add(board)
+        db.flush()
+        result = BoardOut.model_validate(board)
         db.commit()
-        db.refresh(board)
-        return BoardOut.from_orm(board)
+        return result
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -153,8 +188,8 @@ async def update_board(
     current_user: User = Depends(get_current_user),
 ):
     """Update a board record"""
-    board = db.query(Board).filter(
-        (Board.id == board_id) & (Board.user_id == current_user.id)
+    board = db.scalars(
+        select(Board).where(Board.id == board_id, Board.user_id == current_user.id)
     ).first()
 
     if not board:
@@ -175,7 +210,7 @@ async def update_board(
 
         db.commit()
         db.refresh(board)
-        return BoardOut.from_orm(board)
+        return BoardOut.model_validate(board)
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -191,8 +226,8 @@ async def delete_board(
     current_user: User = Depends(get_current_user),
 ):
     """Delete a board record"""
-    board = db.query(Board).filter(
-        (Board.id == board_id) & (Board.user_id == current_user.id)
+    board = db.scalars(
+        select(Board).where(Board.id == board_id, Board.user_id == current_user.id)
     ).first()
 
     if not board:
@@ -221,8 +256,8 @@ async def save_scan(
 ):
     """Save scan session progress"""
     # Verify board exists and belongs to user
-    board = db.query(Board).filter(
-        (Board.id == board_id) & (Board.user_id == current_user.id)
+    board = db.scalars(
+        select(Board).where(Board.id == board_id, Board.user_id == current_user.id)
     ).first()
 
     if not board:
@@ -230,7 +265,6 @@ async def save_scan(
 
     try:
         scan = ScanModel(
-            id=str(uuid.uuid4()),
             board_id=board_id,
             user_id=current_user.id,
             side=side,
@@ -239,14 +273,15 @@ async def save_scan(
         )
 
         db.add(scan)
-        db.commit()
-        db.refresh(scan)
-
-        return {
+        db.flush()
+        result = {
             "id": scan.id,
             "status": scan.status,
             "quality_score": scan.quality_score,
         }
+        db.commit()
+
+        return result
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -262,52 +297,55 @@ async def get_scans(
     current_user: User = Depends(get_current_user),
 ):
     """Get all scans for a board"""
-    # Verify board exists and belongs to user
-    board = db.query(Board).filter(
-        (Board.id == board_id) & (Board.user_id == current_user.id)
-    ).first()
-
-    if not board:
+    # Ownership check touches only the (id, user_id) index
+    owned = db.scalar(
+        select(Board.id).where(Board.id == board_id, Board.user_id == current_user.id)
+    )
+    if owned is None:
         raise BoardNotFound(board_id)
 
-    scans = db.query(ScanModel).filter(ScanModel.board_id == board_id).all()
+    # Plain row mappings skip ORM instance construction on this read-only path
+    scans = db.execute(
+        select(
+            ScanModel.id,
+            ScanModel.side,
+            ScanModel.status,
+            ScanModel.quality_score,
+            ScanModel.created_at,
+        ).where(ScanModel.board_id == board_id)
+    ).mappings().all()
 
     return {
         "board_id": board_id,
         "total": len(scans),
-        "scans": [
-            {
-                "id": s.id,
-                "side": s.side,
-                "status": s.status,
-                "quality_score": s.quality_score,
-                "created_at": s.created_at,
-            }
-            for s in scans
-        ],
+        "scans": scans,
     }
 
 
+# Sample boards are static, so the response body is encoded once at import
+_SAMPLES_BODY = orjson.dumps({
+    "samples": [
+        {
+            "id": "sample-front",
+            "boardId": "sample-board-01",
+            "deviceModel": "Laptop Motherboard",
+            "side": "front",
+            "imageUrl": "/api/uploads/laptop-motherboard-front.jpg",
+            "notes": "Sample laptop motherboard - front side",
+        },
+        {
+            "id": "sample-back",
+            "boardId": "sample-board-02",
+            "deviceModel": "Circuit Board",
+            "side": "back",
+            "imageUrl": "/api/uploads/computer-circuit-back.jpg",
+            "notes": "Sample computer circuit board - back side",
+        },
+    ]
+})
+
+
 @router.get("/boards/samples/list")
 async def get_sample_boards():
     """Get sample boards for study mode testing"""
-    return {
-        "samples": [
-            {
-                "id": "sample-front",
-                "boardId": "sample-board-01",
-                "deviceModel": "Laptop Motherboard",
-                "side": "front",
-                "imageUrl": "/api/uploads/laptop-motherboard-front.jpg",
-                "notes": "Sample laptop motherboard - front side",
-            },
-            {
-                "id": "sample-back",
-                "boardId": "sample-board-02", 
-                "deviceModel": "Circuit Board",
-                "side": "back",
-                "imageUrl": "/api/uploads/computer-circuit-back.jpg",
-                "notes": "Sample computer circuit board - back side",
-            },
-        ]
-    }
\ No newline at end of file
+    return Response(content=_SAMPLES_BODY, media_type="application/json")
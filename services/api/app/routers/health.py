@@ -3,15 +3,19 @@ services/api/app/routers/health.py
 Health check endpoint
 """
 
-from fastapi import APIRouter
+import orjson
+from fastapi import APIRouter, Response
 
 router = APIRouter()
 
+# The payload never changes, so encode it once at import
+_HEALTH_BODY = orjson.dumps({
+    "status": "healthy",
+    "service": "sasasight-api",
+})
+
 
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "service": "sasasight-api",
-    }
+    return Response(content=_HEALTH_BODY, media_type="application/json")
@@ -4,18 +4,28 @@ AI inference endpoints for component detection, OCR, and board ID recognition
 """
 
 import io
-import uuid
-from typing import List, Optional
-from fastapi import APIRouter, File, UploadFile, HTTPException, status, Depends
+import os
+import asyncio
+import re
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, List, Optional
+from fastapi import APIRouter, File, UploadFile, HTTPException, Query, status, Depends
 from pydantic import BaseModel
 from PIL import Image
+import cv2
+import numpy as np
 import logging
 from sqlalchemy.orm import Session
 
 from app.db import get_db
 from app.dependencies import get_current_user
 from app.db.orm_models import User
-import difflib
+from rapidfuzz import fuzz, process
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -44,6 +54,19 @@ except ImportError as e:
     HAS_PYTESSERACT = False
     logger.warning(f"❌ pytesseract not installed: {e}, using fallback OCR")
 
+# Prefer the in-process Tesseract API: the model stays loaded and images are
+# passed in memory, with no subprocess or temp file per call
+try:
+    from tesserocr import OEM, PSM, PyTessBaseAPI
+    
+    HAS_TESSEROCR = True
+    logger.info("✅ tesserocr loaded successfully")
+except ImportError:
+    HAS_TESSEROCR = False
+
+HAS_OCR = HAS_TESSEROCR or HAS_PYTESSERACT
+OCR_ALGORITHM = "tesserocr" if HAS_TESSEROCR else "pytesseract" if HAS_PYTESSERACT else "fallback"
+
 # Pydantic models
 class ImageRequest(BaseModel):
     imageUrl: str
@@ -59,6 +82,7 @@ class ProcessedImageStage(BaseModel):
     label: str
     description: str
     image_base64: str  # Base64 encoded image
+    mime_type: str = "image/webp"
 
 
 class OcrResponseEnhanced(BaseModel):
@@ -104,100 +128,122 @@ COMPONENT_PREFIXES = {
 }
 
 
+# Reference designator: 1-3 letter prefix, number, optional letter suffix (R120, U7, R120A)
+_REF_DES_RE = re.compile(r'^([A-Z]{1,3})(\d+)[A-Z]?$')
+
+# Board ID patterns, tried in order against each OCR region
+_BOARD_ID_PATTERNS = tuple(re.compile(p) for p in (
+    r'([A-Z0-9]{4,}-[A-Z0-9]{4,})',  # XXXX-XXXX
+    r'(REV\s*[A-Z0-9]+)',  # REV A1
+    r'(MODEL\s*[\w-]+)',  # MODEL XXXX
+    r'([A-Z0-9]{6,}-[A-Z0-9]{1,})',  # Extended format
+))
+
+
 def extract_reference_designator(text: str) -> Optional[str]:
     """Extract reference designator from text (e.g., 'R120', 'C33', 'U7')"""
     text = text.upper().strip()
     
-    # Common patterns
-    patterns = [
-        (r'^([A-Z]{1,3})(\d+)$', 'simple'),  # R120, U7, LED1
-        (r'^([A-Z]{1,3})(\d+)([A-Z]?)$', 'with_suffix'),  # R120A
-    ]
-    
-    import re
-    for pattern, ptype in patterns:
-        match = re.match(pattern, text)
-        if match:
-            prefix = match.group(1)
-            if prefix in COMPONENT_PREFIXES:
-                return text
+    match = _REF_DES_RE.match(text)
+    if match and match.group(1) in COMPONENT_PREFIXES:
+        return text
     
     return None
 
 
+# Common OCR confusions (0↔O, 1↔I↔L, 5↔S, 8↔B) folded to one canonical character
+_CONFUSABLES_TABLE = str.maketrans({'O': '0', 'I': '1', 'L': '1', 'S': '5', 'B': '8'})
+
+
 def fuzzy_match_designator(detected: str, ocr_texts: List[str], threshold: float = 0.6) -> Optional[str]:
     """Find best fuzzy match for a detected designator in OCR results"""
     detected_upper = detected.upper().strip()
+    choices = [ocr_text.upper().strip() for ocr_text in ocr_texts]
+    cutoff = threshold * 100
+    
+    # Direct similarity, then again with confusable characters canonicalized
+    direct = process.extractOne(detected_upper, choices, scorer=fuzz.ratio, score_cutoff=cutoff)
+    canonical = process.extractOne(
+        detected_upper.translate(_CONFUSABLES_TABLE),
+        [choice.translate(_CONFUSABLES_TABLE) for choice in choices],
+        scorer=fuzz.ratio,
+        score_cutoff=cutoff,
+    )
     
-    # Handle common OCR confusions: 0↔O, 1↔I, 5↔S, 8↔B, etc.
-    confusables = {
-        '0': ['O'],
-        'O': ['0'],
-        '1': ['I', 'L'],
-        'I': ['1', 'L'],
-        'L': ['1', 'I'],
-        '5': ['S'],
-        'S': ['5'],
-        '8': ['B'],
-        'B': ['8'],
-    }
-    
-    best_match = None
-    best_ratio = threshold
-    
-    for ocr_text in ocr_texts:
-        ocr_upper = ocr_text.upper().strip()
-        
-        # Direct similarity
-        ratio = difflib.SequenceMatcher(None, detected_upper, ocr_upper).ratio()
-        
-        if ratio > best_ratio:
-            best_ratio = ratio
-            best_match = ocr_text
-        
-        # Check with character substitutions
-        for confusion_char, alternatives in confusables.items():
-            for alt in alternatives:
-                modified = ocr_upper.replace(alt, confusion_char)
-                ratio = difflib.SequenceMatcher(None, detected_upper, modified).ratio()
-                if ratio > best_ratio:
-                    best_ratio = ratio
-                    best_match = ocr_text
-    
-    return best_match if best_ratio > threshold else None
-
-
-def preprocess_image_for_ocr(image: Image.Image, return_stages: bool = False) -> tuple[Image.Image, List[ProcessedImageStage]]:
+    best = max((m for m in (direct, canonical) if m), key=lambda m: m[1], default=None)
+    if best is None or best[1] <= cutoff:
+        return None
+    return ocr_texts[best[2]]
+
+
+# HSV (OpenCV 8-bit) ranges of common component body colors
+COMPONENT_HSV_RANGES = tuple(
+    (np.array(lower, dtype=np.uint8), np.array(upper, dtype=np.uint8))
+    for lower, upper in (
+        ((0, 0, 0), (180, 255, 50)),  # Black components (SMD - very dark)
+        ((100, 50, 50), (130, 255, 255)),  # Blue components (capacitors)
+        ((40, 30, 30), (80, 255, 255)),  # Green components (resistors)
+        ((0, 50, 50), (20, 255, 255)),  # Brown/Orange components (ICs, transistors)
+    )
+)
+
+def decode_image(contents: bytes, flags: int = cv2.IMREAD_COLOR) -> np.ndarray:
+    """Decode uploaded bytes straight into a BGR (or, with IMREAD_GRAYSCALE, gray) array"""
+    image = cv2.imdecode(np.frombuffer(contents, np.uint8), flags)
+    if image is None:
+        raise ValueError("Unsupported or corrupt image data")
+    return image
+
+
+# Longest side fed to the OCR preprocessing pipeline
+OCR_MAX_DIM = 1600
+
+# Debug stages are UI previews: longest side capped, WebP quality 70
+STAGE_PREVIEW_MAX_SIZE = 512
+STAGE_WEBP_QUALITY = 70
+
+# Rectangular structuring elements shared by every morphology step
+_K2 = cv2.getStructuringElement(cv2.MORPH_RECT, (2, 2))
+_K3 = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+_K5 = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+
+
+def preprocess_image_for_ocr(image: np.ndarray, return_stages: bool = False) -> tuple[np.ndarray, List[ProcessedImageStage], float]:
     """Apply comprehensive image preprocessing to improve OCR accuracy on PCB boards
     
+    Images larger than OCR_MAX_DIM on their longest side are downscaled first.
+    
     Args:
-        image: Input PIL Image
+        image: Input BGR image as decoded by cv2.imdecode
         return_stages: If True, return all intermediate processing stages
         
     Returns:
-        Tuple of (processed_image, stages_list)
+        Tuple of (processed_image, stages_list, scale), where scale maps
+        original coordinates to processed-image coordinates
     """
     stages = []
+    scale = 1.0
     
     try:
-        import cv2
-        import numpy as np
         import base64
-        from io import BytesIO
         
         def image_to_base64(img_array: np.ndarray, is_grayscale: bool = True) -> str:
-            """Convert numpy array to base64 string"""
-            if is_grayscale and len(img_array.shape) == 2:
-                pil_img = Image.fromarray(img_array)
-            else:
-                pil_img = Image.fromarray(cv2.cvtColor(img_array, cv2.COLOR_BGR2RGB) if len(img_array.shape) == 3 else img_array)
-            
-            buffered = BytesIO()
-            pil_img.save(buffered, format="JPEG", quality=85)
-            return base64.b64encode(buffered.getvalue()).decode('utf-8')
-        
-        # Convert PIL to OpenCV format
-        img_array = np.array(image)
+            """Encode a BGR or grayscale stage as a base64 WebP preview"""
+            h, w = img_array.shape[:2]
+            scale = STAGE_PREVIEW_MAX_SIZE / max(h, w)
+            if scale < 1.0:
+                img_array = cv2.resize(img_array, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            ok, encoded = cv2.imencode('.webp', img_array, [cv2.IMWRITE_WEBP_QUALITY, STAGE_WEBP_QUALITY])
+            if not ok:
+                raise ValueError("WebP encoding failed")
+            return base64.b64encode(encoded).decode('ascii')
+        
+        img_array = image
+        
+        # Every later stage is O(W·H); PSM 11 reads PCB text fine at this size
+        scale = min(1.0, OCR_MAX_DIM / max(img_array.shape[:2]))
+        if scale < 1.0:
+            img_array = cv2.resize(img_array, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
         
         # STEP 1: Original Image
         if return_stages:
@@ -209,7 +255,7 @@ def preprocess_image_for_ocr(image: Image.Image, return_stages: bool = False) ->
         
         # STEP 2: Convert to grayscale
         if len(img_array.shape) == 3:
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+            gray = cv2.cvtColor(img_array, cv2.COLOR_BGR2GRAY)
         else:
             gray = img_array
         
@@ -230,20 +276,9 @@ def preprocess_image_for_ocr(image: Image.Image, return_stages: bool = False) ->
                 image_base64=image_to_base64(denoised)
             ))
         
-        # STEP 4: Sharpen image to enhance text edges
-        gaussian = cv2.GaussianBlur(denoised, (0, 0), 2.0)
-        sharpened = cv2.addWeighted(denoised, 1.5, gaussian, -0.5, 0)
-        
-        if return_stages:
-            stages.append(ProcessedImageStage(
-                label="Sharpened",
-                description="Unsharp mask applied to enhance text edges and clarity",
-                image_base64=image_to_base64(sharpened)
-            ))
-        
-        # STEP 5: Apply CLAHE for adaptive contrast enhancement
+        # STEP 4: Apply CLAHE for adaptive contrast enhancement
         clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        enhanced = clahe.apply(sharpened)
+        enhanced = clahe.apply(denoised)
         
         if return_stages:
             stages.append(ProcessedImageStage(
@@ -252,8 +287,9 @@ def preprocess_image_for_ocr(image: Image.Image, return_stages: bool = False) ->
                 image_base64=image_to_base64(enhanced)
             ))
         
-        # STEP 6: Slight Gaussian smoothing before thresholding
-        smoothed = cv2.GaussianBlur(enhanced, (3, 3), 0)
+        # STEP 5-6: One Gaussian pass smooths before thresholding; the separate
+        # unsharp-mask blur would only be undone by this smoothing
+        smoothed = cv2.GaussianBlur(enhanced, (5, 5), 1.0)
         
         if return_stages:
             stages.append(ProcessedImageStage(
@@ -285,32 +321,10 @@ def preprocess_image_for_ocr(image: Image.Image, return_stages: bool = False) ->
                 image_base64=image_to_base64(binary_otsu)
             ))
         
-        # STEP 9: Dilation to thicken text strokes
-        kernel_dilate = np.ones((2, 2), np.uint8)
-        dilated = cv2.dilate(binary_adaptive, kernel_dilate, iterations=1)
-        
-        if return_stages:
-            stages.append(ProcessedImageStage(
-                label="Dilated",
-                description="Dilation thickens text strokes to connect broken characters",
-                image_base64=image_to_base64(dilated)
-            ))
-        
-        # STEP 10: Erosion to remove small noise artifacts
-        kernel_erode = np.ones((2, 2), np.uint8)
-        eroded = cv2.erode(dilated, kernel_erode, iterations=1)
-        
-        if return_stages:
-            stages.append(ProcessedImageStage(
-                label="Eroded",
-                description="Erosion removes small noise while preserving text",
-                image_base64=image_to_base64(eroded)
-            ))
-        
-        # STEP 11: Final morphological cleanup
-        kernel_final = np.ones((2, 2), np.uint8)
-        cleaned = cv2.morphologyEx(eroded, cv2.MORPH_CLOSE, kernel_final)
-        cleaned = cv2.morphologyEx(cleaned, cv2.MORPH_OPEN, kernel_final)
+        # STEP 9-11: Morphological cleanup. The former dilate→erode pair was
+        # already a close, so a single close→open does the same job
+        cleaned = cv2.morphologyEx(binary_adaptive, cv2.MORPH_CLOSE, _K2)
+        cleaned = cv2.morphologyEx(cleaned, cv2.MORPH_OPEN, _K2)
         
         if return_stages:
             stages.append(ProcessedImageStage(
@@ -319,6 +333,11 @@ def preprocess_image_for_ocr(image: Image.Image, return_stages: bool = False) ->
                 image_base64=image_to_base64(cleaned)
             ))
         
+        # Only `cleaned` feeds Tesseract; steps 12-18 (trace and
+        # component analysis) exist purely to render debug stages
+        if not return_stages:
+            return cleaned, stages, scale
+        
         # ==================== TRACE DETECTION SECTION ====================
         # STEP 12: Canny Edge Detection (for trace detection)
         canny_edges = cv2.Canny(smoothed, 50, 150)
@@ -331,9 +350,8 @@ def preprocess_image_for_ocr(image: Image.Image, return_stages: bool = False) ->
             ))
         
         # STEP 13: Trace Enhancement using morphology on Canny edges
-        kernel_trace = np.ones((3, 3), np.uint8)
-        trace_enhanced = cv2.dilate(canny_edges, kernel_trace, iterations=2)
-        trace_enhanced = cv2.erode(trace_enhanced, kernel_trace, iterations=1)
+        trace_enhanced = cv2.dilate(canny_edges, _K3, iterations=2)
+        trace_enhanced = cv2.erode(trace_enhanced, _K3, iterations=1)
         
         if return_stages:
             stages.append(ProcessedImageStage(
@@ -348,43 +366,18 @@ def preprocess_image_for_ocr(image: Image.Image, return_stages: bool = False) ->
         
         if len(img_array.shape) == 3:
             # Convert to HSV for better color detection
-            hsv = cv2.cvtColor(img_array, cv2.COLOR_RGB2HSV)
-            
-            # Detect common component colors
-            # Black components (SMD - very dark)
-            lower_black = np.array([0, 0, 0])
-            upper_black = np.array([180, 255, 50])
-            mask_black = cv2.inRange(hsv, lower_black, upper_black)
-            
-            # Blue components (capacitors)
-            lower_blue = np.array([100, 50, 50])
-            upper_blue = np.array([130, 255, 255])
-            mask_blue = cv2.inRange(hsv, lower_blue, upper_blue)
-            
-            # Green components (resistors)
-            lower_green = np.array([40, 30, 30])
-            upper_green = np.array([80, 255, 255])
-            mask_green = cv2.inRange(hsv, lower_green, upper_green)
+            hsv = cv2.cvtColor(img_array, cv2.COLOR_BGR2HSV)
             
-            # Brown/Orange components (ICs, transistors)
-            lower_brown1 = np.array([10, 50, 50])
-            upper_brown1 = np.array([20, 255, 255])
-            mask_brown1 = cv2.inRange(hsv, lower_brown1, upper_brown1)
-            
-            lower_brown2 = np.array([0, 50, 50])
-            upper_brown2 = np.array([10, 255, 255])
-            mask_brown2 = cv2.inRange(hsv, lower_brown2, upper_brown2)
-            
-            # Combine all component masks
-            component_mask = cv2.bitwise_or(mask_black, mask_blue)
-            component_mask = cv2.bitwise_or(component_mask, mask_green)
-            component_mask = cv2.bitwise_or(component_mask, mask_brown1)
-            component_mask = cv2.bitwise_or(component_mask, mask_brown2)
+            # Detect common component colors in one accumulated mask
+            component_mask = cv2.inRange(hsv, *COMPONENT_HSV_RANGES[0])
+            range_mask = np.empty_like(component_mask)
+            for lower, upper in COMPONENT_HSV_RANGES[1:]:
+                cv2.inRange(hsv, lower, upper, dst=range_mask)
+                cv2.bitwise_or(component_mask, range_mask, dst=component_mask)
             
             # Morphological cleanup of component mask
-            kernel_comp = np.ones((5, 5), np.uint8)
-            component_mask = cv2.morphologyEx(component_mask, cv2.MORPH_CLOSE, kernel_comp)
-            component_mask = cv2.morphologyEx(component_mask, cv2.MORPH_OPEN, kernel_comp)
+            component_mask = cv2.morphologyEx(component_mask, cv2.MORPH_CLOSE, _K5)
+            component_mask = cv2.morphologyEx(component_mask, cv2.MORPH_OPEN, _K5)
         
         if return_stages:
             stages.append(ProcessedImageStage(
@@ -396,21 +389,20 @@ def preprocess_image_for_ocr(image: Image.Image, return_stages: bool = False) ->
         # STEP 15: Component Suppression (create image with components removed)
         suppressed = gray.copy()
         if len(img_array.shape) == 3:
-            # Use color inpainting to fill component areas
+            # Fill component areas with a local box-filter mean (a separable
+            # O(1)-per-pixel blur) instead of iterative Telea inpainting
             component_mask_uint8 = component_mask.astype(np.uint8)
             # Dilate mask to ensure full component removal
-            kernel_inpaint = np.ones((5, 5), np.uint8)
-            mask_dilated = cv2.dilate(component_mask_uint8, kernel_inpaint, iterations=2)
+            mask_dilated = cv2.dilate(component_mask_uint8, _K5, iterations=2)
             
-            # Simple inpainting: replace component areas with background average
-            suppressed_color = img_array.copy()
-            board_background = cv2.inpaint(suppressed_color, mask_dilated, 3, cv2.INPAINT_TELEA)
-            suppressed = cv2.cvtColor(board_background, cv2.COLOR_RGB2GRAY)
+            board_blurred = cv2.blur(img_array, (31, 31))
+            board_background = np.where((mask_dilated > 0)[:, :, None], board_blurred, img_array)
+            suppressed = cv2.cvtColor(board_background, cv2.COLOR_BGR2GRAY)
         
         if return_stages:
             stages.append(ProcessedImageStage(
                 label="Component Suppressed",
-                description="Inpainting removes components and fills areas with background color",
+                description="Component areas are filled with the surrounding board background color",
                 image_base64=image_to_base64(suppressed)
             ))
         
@@ -429,17 +421,12 @@ def preprocess_image_for_ocr(image: Image.Image, return_stages: bool = False) ->
         
         # ==================== COLORED TRACE OVERLAY SECTION ====================
         # STEP 17: Colored Traces - Blue overlay on original
-        trace_colored = img_array.copy().astype(np.float32)
-        
-        # Create blue colored trace overlay
-        trace_colored_bgr = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR).astype(np.float32)
-        blue_overlay = np.zeros_like(trace_colored_bgr)
-        blue_overlay[:, :, 0] = 255  # Blue channel
+        # Blue only where traces are detected: the 0/255 mask is the blue channel
+        blue_overlay = np.zeros_like(img_array)
+        blue_overlay[:, :, 0] = trace_mask
         
-        # Apply blue color only where traces are detected
-        trace_mask_3channel = cv2.cvtColor(trace_mask, cv2.COLOR_GRAY2BGR).astype(np.float32) / 255.0
-        trace_colored_bgr = cv2.addWeighted(trace_colored_bgr, 0.7, blue_overlay * trace_mask_3channel, 0.3, 0)
-        trace_colored_output = cv2.cvtColor(trace_colored_bgr.astype(np.uint8), cv2.COLOR_BGR2RGB)
+        # Blend in uint8 (saturating) rather than via float32 copies
+        trace_colored_output = cv2.addWeighted(img_array, 0.7, blue_overlay, 0.3, 0)
         
         if return_stages:
             stages.append(ProcessedImageStage(
@@ -460,73 +447,148 @@ def preprocess_image_for_ocr(image: Image.Image, return_stages: bool = False) ->
                 image_base64=image_to_base64(board_with_traces)
             ))
         
-        # Convert back to PIL using the final cleaned version for OCR
-        return Image.fromarray(cleaned), stages
+        # The final cleaned version is the OCR input
+        return cleaned, stages, scale
         
     except Exception as e:
         logger.warning(f"Image preprocessing failed: {e}, using original")
-        return image, stages
+        return image, stages, 1.0
+
+
+# Configure Tesseract for PCB text (small, mixed alphanumeric)
+TESSERACT_WHITELIST = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+TESSERACT_CONFIG = f'--oem 3 --psm 11 -c tessedit_char_whitelist={TESSERACT_WHITELIST}'
+
+# Upper bound on images accepted by /inference/ocr-batch
+MAX_BATCH_FILES = 32
+
+# Most confident text regions kept per image (and default/max `top_k`)
+OCR_MAX_REGIONS = 200
+
+# Tesseract and OpenCV release the GIL, so OCR runs on worker threads instead
+# of blocking the event loop; Tesseract uses up to 4 threads internally
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(max(1, (os.cpu_count() or 1) // 4))))
+_OCR_POOL = ThreadPoolExecutor(max_workers=OCR_WORKERS, thread_name_prefix="ocr")
+
+# One tesserocr API per OCR worker thread (the API is not thread-safe)
+_tess_local = threading.local()
 
 
-def perform_ocr_tesseract(image: Image.Image, return_stages: bool = False) -> tuple[List[OCRResult], List[ProcessedImageStage]]:
-    """Perform OCR using pytesseract with enhanced preprocessing
+def _image_to_data_tesserocr(image: np.ndarray) -> dict:
+    """Run the in-process Tesseract API, returning image_to_data-style columns"""
+    api = getattr(_tess_local, "api", None)
+    if api is None:
+        api = PyTessBaseAPI(psm=PSM.SPARSE_TEXT, oem=OEM.DEFAULT)
+        api.SetVariable("tessedit_char_whitelist", TESSERACT_WHITELIST)
+        _tess_local.api = api
+    
+    api.SetImage(Image.fromarray(image))
+    tsv = api.GetTSVText(0)
+    
+    # TSV columns: level page_num block_num par_num line_num word_num
+    #              left top width height conf text
+    data = {key: [] for key in ('page_num', 'left', 'top', 'width', 'height', 'conf', 'text')}
+    for line in tsv.splitlines():
+        cells = line.split('\t')
+        if len(cells) < 11:
+            continue
+        data['page_num'].append(int(cells[1]))
+        data['left'].append(int(cells[6]))
+        data['top'].append(int(cells[7]))
+        data['width'].append(int(cells[8]))
+        data['height'].append(int(cells[9]))
+        data['conf'].append(float(cells[10]))
+        data['text'].append(cells[11] if len(cells) > 11 else '')
+    return data
+
+
+def _collect_ocr_results(data: dict, rows, scale: float = 1.0, top_k: int = OCR_MAX_REGIONS) -> List[dict]:
+    """Filter raw image_to_data rows down to confident, multi-character regions
+    
+    At most `top_k` of the most confident regions are kept, in reading order.
+    Bounding boxes are mapped back to original image coordinates by `scale`.
+    """
+    rows = np.asarray(rows, dtype=np.intp)
+    if rows.size == 0:
+        return []
+    
+    # Filter all rows at once; only kept rows become Python objects
+    text = np.char.strip(np.asarray(data['text'], dtype=str)[rows])
+    conf = np.trunc(np.asarray(data['conf'], dtype=np.float64)[rows])
+    keep = (np.char.str_len(text) >= 2) & (conf > 40)  # Skip short text, low confidence
+    
+    kept, kept_text, kept_conf = rows[keep], text[keep], conf[keep]
+    if len(kept) > top_k:
+        # Partial selection (O(n)) of the most confident rows, back in reading order
+        top = np.sort(np.argpartition(-kept_conf, top_k)[:top_k])
+        kept, kept_text, kept_conf = kept[top], kept_text[top], kept_conf[top]
+    
+    boxes = np.column_stack([
+        np.asarray(data[key], dtype=np.float64)[kept]
+        for key in ('left', 'top', 'width', 'height')
+    ])
+    boxes = np.rint(boxes / scale).astype(np.int64).tolist()
+    
+    rejected = int(np.count_nonzero(np.char.str_len(text) > 0)) - int(np.count_nonzero(keep))
+    if rejected:
+        logger.debug(f"❌ Rejected {rejected} regions (too short or conf <= 40%)")
+    
+    # Plain dicts in the OCRResult wire shape; no per-region model allocation
+    return [
+        {
+            'text': t,
+            'confidence': c / 100.0,
+            'bbox': {'x': x, 'y': y, 'width': w, 'height': h},
+        }
+        for t, c, (x, y, w, h) in zip(kept_text.tolist(), kept_conf.tolist(), boxes)
+    ]
+
+
+def _run_ocr_tesseract(image: np.ndarray, return_stages: bool = False) -> tuple[List[dict], List[ProcessedImageStage]]:
+    """Preprocess and OCR one image; Tesseract errors propagate to the caller"""
+    logger.info("🔧 Starting Tesseract OCR with preprocessing...")
+    
+    # Preprocess image for better OCR
+    preprocessed, stages, scale = preprocess_image_for_ocr(image, return_stages=return_stages)
+    logger.info(f"✅ Preprocessing complete: {preprocessed.shape[1]}x{preprocessed.shape[0]} pixels")
+    
+    logger.info(f"⚙️ Tesseract config: {TESSERACT_CONFIG}")
+    
+    # Get detailed data with bounding boxes
+    if HAS_TESSEROCR:
+        data = _image_to_data_tesserocr(preprocessed)
+    else:
+        logger.info("🔍 Calling pytesseract.image_to_data...")
+        data = pytesseract.image_to_data(
+            preprocessed, 
+            config=TESSERACT_CONFIG,
+            output_type='dict'
+        )
+    
+    logger.info(f"📊 Tesseract returned {len(data['text'])} raw text entries")
+    
+    results = _collect_ocr_results(data, range(len(data['text'])), scale)
+    
+    logger.info(f"✅ OCR extracted {len(results)} text regions (after filtering)")
+    return results, stages
+
+
+def perform_ocr_tesseract(image: np.ndarray, return_stages: bool = False) -> tuple[List[dict], List[ProcessedImageStage]]:
+    """Perform OCR using Tesseract (tesserocr, else pytesseract) with enhanced preprocessing
     
     Args:
-        image: Input PIL Image
+        image: Input BGR image
         return_stages: If True, return intermediate processing stages
         
     Returns:
         Tuple of (ocr_results, processing_stages)
     """
-    if not HAS_PYTESSERACT:
-        logger.error("❌ pytesseract not available!")
+    if not HAS_OCR:
+        logger.error("❌ No Tesseract binding available!")
         return [], []
     
     try:
-        logger.info("🔧 Starting Tesseract OCR with preprocessing...")
-        
-        # Preprocess image for better OCR
-        preprocessed, stages = preprocess_image_for_ocr(image, return_stages=return_stages)
-        logger.info(f"✅ Preprocessing complete: {preprocessed.size} pixels")
-        
-        # Configure Tesseract for PCB text (small, mixed alphanumeric)
-        custom_config = r'--oem 3 --psm 11 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
-        logger.info(f"⚙️ Tesseract config: {custom_config}")
-        
-        # Get detailed data with bounding boxes
-        logger.info("🔍 Calling pytesseract.image_to_data...")
-        data = pytesseract.image_to_data(
-            preprocessed, 
-            config=custom_config,
-            output_type='dict'
-        )
-        
-        logger.info(f"📊 Tesseract returned {len(data['text'])} raw text entries")
-        
-        results = []
-        for i in range(len(data['text'])):
-            text = data['text'][i].strip()
-            if text and len(text) >= 2:  # Skip single chars and empty
-                conf = int(data['conf'][i])
-                if conf > 40:  # Confidence threshold
-                    results.append(OCRResult(
-                        text=text,
-                        confidence=conf / 100.0,
-                        bbox={
-                            'x': int(data['left'][i]),
-                            'y': int(data['top'][i]),
-                            'width': int(data['width'][i]),
-                            'height': int(data['height'][i]),
-                        }
-                    ))
-                else:
-                    logger.debug(f"❌ Rejected '{text}' (conf={conf}%)")
-            elif text:
-                logger.debug(f"❌ Rejected '{text}' (too short: {len(text)} chars)")
-        
-        logger.info(f"✅ OCR extracted {len(results)} text regions (after filtering)")
-        return results, stages
-        
+        return _run_ocr_tesseract(image, return_stages)
     except Exception as e:
         logger.error(f"❌ OCR error: {str(e)}")
         import traceback
@@ -534,45 +596,220 @@ def perform_ocr_tesseract(image: Image.Image, return_stages: bool = False) -> tu
         return [], []
 
 
-def perform_ocr_fallback(image: Image.Image) -> List[OCRResult]:
+def perform_ocr_tesseract_batch(images: List[np.ndarray]) -> List[List[dict]]:
+    """Perform OCR on several images with a single Tesseract process
+    
+    Preprocessed pages are written to a temporary directory and passed to
+    Tesseract as a list file, so process start-up and model loading are
+    paid once per batch instead of once per image.
+    
+    Args:
+        images: Input BGR images
+        
+    Returns:
+        One list of OCR results per input image, in input order
+    """
+    if HAS_TESSEROCR:
+        # No per-process start-up to amortize with the in-process API
+        return [perform_ocr_tesseract(image)[0] for image in images]
+    
+    if not HAS_PYTESSERACT:
+        logger.error("❌ pytesseract not available!")
+        return [[] for _ in images]
+    
+    with tempfile.TemporaryDirectory(prefix="ocr-batch-") as tmpdir:
+        paths = []
+        scales = []
+        for i, image in enumerate(images):
+            preprocessed, _, scale = preprocess_image_for_ocr(image)
+            scales.append(scale)
+            path = os.path.join(tmpdir, f"{i}.png")
+            cv2.imwrite(path, preprocessed)
+            paths.append(path)
+        
+        list_path = os.path.join(tmpdir, "imglist.txt")
+        with open(list_path, "w") as f:
+            f.write("\n".join(paths) + "\n")
+        
+        # A .txt input is read by Tesseract as a list of image paths
+        data = pytesseract.image_to_data(list_path, config=TESSERACT_CONFIG, output_type='dict')
+    
+    # Rows carry a 1-based page_num in list-file order
+    rows_by_page = [[] for _ in images]
+    for i, page in enumerate(data.get('page_num', [])):
+        if 1 <= page <= len(images):
+            rows_by_page[page - 1].append(i)
+    
+    results = [
+        _collect_ocr_results(data, rows, scale)
+        for rows, scale in zip(rows_by_page, scales)
+    ]
+    logger.info(f"✅ Batch OCR extracted {sum(map(len, results))} text regions from {len(images)} images")
+    return results
+
+
+def perform_ocr_fallback(image: np.ndarray) -> List[dict]:
     """Fallback OCR - return empty list or use simple heuristics"""
     logger.warning("Using fallback OCR (no real OCR library available)")
     return []
 
 
+@dataclass(frozen=True)
+class OcrBundle:
+    """OCR output for one upload, shared by every post-processing step"""
+    results: List[dict]
+    stages: List[ProcessedImageStage]
+    image_size: tuple[int, int]
+    image_hash: bytes
+    has_stages: bool = False
+
+
+# OCR bundles by upload digest: blake2b(contents) -> OcrBundle
+OCR_CACHE_SIZE = 128
+_ocr_cache: "OrderedDict[bytes, OcrBundle]" = OrderedDict()
+_ocr_cache_lock = threading.Lock()
+
+
+def _ocr_and_cache(contents: bytes, return_stages: bool = False) -> OcrBundle:
+    """Decode, preprocess and OCR uploaded image bytes once, memoized by content digest
+
+    Repeat uploads of the same image skip decoding, preprocessing and the
+    Tesseract call. A bundle computed with stages also serves requests
+    that do not need them. Failed OCR runs are not cached.
+    """
+    key = hashlib.blake2b(contents, digest_size=16).digest()
+    with _ocr_cache_lock:
+        bundle = _ocr_cache.get(key)
+        if bundle is not None and (bundle.has_stages or not return_stages):
+            _ocr_cache.move_to_end(key)
+            return bundle
+
+    image = decode_image(contents)
+    image_size = (image.shape[1], image.shape[0])
+    logger.info(f"📸 Image decoded: {image_size[0]}x{image_size[1]} pixels")
+    if not HAS_OCR:
+        return OcrBundle(perform_ocr_fallback(image), [], image_size, key)
+
+    try:
+        results, stages = _run_ocr_tesseract(image, return_stages=return_stages)
+    except Exception as e:
+        # Answer this request with no text, but leave the image uncached so a
+        # transient Tesseract failure is retried on the next upload
+        logger.error(f"❌ OCR error: {str(e)}")
+        return OcrBundle([], [], image_size, key)
+    bundle = OcrBundle(results, stages, image_size, key, has_stages=return_stages)
+
+    with _ocr_cache_lock:
+        _ocr_cache[key] = bundle
+        _ocr_cache.move_to_end(key)
+        if len(_ocr_cache) > OCR_CACHE_SIZE:
+            _ocr_cache.popitem(last=False)
+    return bundle
+
+
+def _read_upload(upload: BinaryIO) -> bytes:
+    """Read an UploadFile's spooled file synchronously, for use inside a worker thread"""
+    upload.seek(0)
+    return upload.read()
+
+
+def _ocr_upload(upload: BinaryIO, return_stages: bool = False) -> OcrBundle:
+    """Read and OCR one upload entirely off the event loop"""
+    return _ocr_and_cache(_read_upload(upload), return_stages)
+
+
+def _ocr_upload_batch(uploads: List[BinaryIO]) -> List[List[dict]]:
+    """Read, decode and OCR several uploads entirely off the event loop"""
+    return perform_ocr_tesseract_batch([decode_image(_read_upload(u)) for u in uploads])
+
+
+def _decode_upload_gray(upload: BinaryIO) -> np.ndarray:
+    """Read and decode one upload straight to grayscale off the event loop"""
+    return decode_image(_read_upload(upload), cv2.IMREAD_GRAYSCALE)
+
+
+def top_regions(ocr_results: List[dict], top_k: int) -> List[dict]:
+    """The `top_k` most confident regions, in their original (reading) order"""
+    if len(ocr_results) <= top_k:
+        return ocr_results
+    conf = np.fromiter((r['confidence'] for r in ocr_results), dtype=np.float64, count=len(ocr_results))
+    top = np.sort(np.argpartition(-conf, top_k)[:top_k])
+    return [ocr_results[i] for i in top.tolist()]
+
+
+def find_board_id(ocr_results: List[dict]) -> tuple[Optional[str], float, Optional[dict]]:
+    """Pick the most confident board ID pattern match (XXXXX-XXXXX, REV, MODEL, etc.)
+    
+    Returns:
+        Tuple of (board_id, confidence, bbox)
+    """
+    board_id = None
+    board_id_confidence = 0.0
+    board_id_bounds = None
+    
+    for result in ocr_results:
+        text = result['text'].upper()
+        
+        # Look for board ID patterns
+        for pattern in _BOARD_ID_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                potential_id = match.group(1)
+                if result['confidence'] > board_id_confidence:
+                    board_id = potential_id
+                    board_id_confidence = result['confidence']
+                    board_id_bounds = result['bbox']
+    
+    return board_id, board_id_confidence, board_id_bounds
+
+
+def match_components(ocr_results: List[dict]) -> List[dict]:
+    """Turn OCR regions that read as reference designators into component matches"""
+    # In production, get detections from ML model
+    # For now, extract reference designators from OCR
+    matches = []
+    
+    for result in ocr_results:
+        ref_des = extract_reference_designator(result['text'])
+        if ref_des:
+            matches.append({
+                "refDes": ref_des,
+                "partNumber": None,
+                "marking": result['text'],
+                "confidence": result['confidence'],
+                "bbox": result['bbox'],
+            })
+    
+    return matches
+
+
 @router.post("/inference/ocr")
 async def extract_text_from_image(
     file: UploadFile = File(...),
+    top_k: int = Query(OCR_MAX_REGIONS, ge=1, le=OCR_MAX_REGIONS),
     db: Session = Depends(get_db),
 ) -> dict:
     """Extract text (OCR) from uploaded image - public endpoint for demo"""
     try:
-        # Read image
-        contents = await file.read()
-        logger.info(f"📥 Received image: {file.filename}, size: {len(contents)} bytes")
-        image = Image.open(io.BytesIO(contents))
-        logger.info(f"📸 Image opened: {image.size} pixels, mode: {image.mode}")
+        logger.info(f"📥 Received image: {file.filename}, size: {file.size} bytes")
         
-        # Perform OCR
-        logger.info(f"🔍 Starting OCR with HAS_PYTESSERACT={HAS_PYTESSERACT}")
-        processed_stages = []
-        
-        if HAS_PYTESSERACT:
-            ocr_results, processed_stages = perform_ocr_tesseract(image, return_stages=True)
-        else:
-            ocr_results = perform_ocr_fallback(image)
+        # Read, decode and OCR in the worker straight from the spooled upload
+        logger.info(f"🔍 Starting OCR with {OCR_ALGORITHM}")
+        loop = asyncio.get_running_loop()
+        bundle = await loop.run_in_executor(_OCR_POOL, _ocr_upload, file.file, True)
+        ocr_results, processed_stages = top_regions(bundle.results, top_k), bundle.stages
         
         logger.info(f"OCR completed: {len(ocr_results)} text regions detected")
         if len(ocr_results) > 0:
-            logger.info(f"📝 Sample detections: {[r.text for r in ocr_results[:5]]}")
+            logger.info(f"📝 Sample detections: {[r['text'] for r in ocr_results[:5]]}")
         else:
             logger.warning("⚠️ NO TEXT DETECTED - check image quality or Tesseract config")
         
         return {
             "status": "success",
-            "text_regions": [r.dict() for r in ocr_results],
+            "text_regions": ocr_results,
             "total_regions": len(ocr_results),
-            "algorithm": "pytesseract" if HAS_PYTESSERACT else "fallback",
+            "algorithm": OCR_ALGORITHM,
             "processed_stages": [s.dict() for s in processed_stages],
         }
     
@@ -584,6 +821,48 @@ async def extract_text_from_image(
         )
 
 
+@router.post("/inference/ocr-batch")
+async def extract_text_batch(
+    files: List[UploadFile] = File(...),
+    top_k: int = Query(OCR_MAX_REGIONS, ge=1, le=OCR_MAX_REGIONS),
+    db: Session = Depends(get_db),
+) -> dict:
+    """Extract text (OCR) from several images in one Tesseract run - public endpoint for demo"""
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_FILES} images per batch"
+        )
+    
+    try:
+        loop = asyncio.get_running_loop()
+        batch_results = await loop.run_in_executor(
+            _OCR_POOL, _ocr_upload_batch, [file.file for file in files]
+        )
+        
+        return {
+            "status": "success",
+            "results": [
+                {
+                    "filename": file.filename,
+                    "text_regions": ocr_results,
+                    "total_regions": len(ocr_results),
+                }
+                for file, ocr_results in zip(
+                    files, (top_regions(results, top_k) for results in batch_results)
+                )
+            ],
+            "algorithm": OCR_ALGORITHM,
+        }
+    
+    except Exception as e:
+        logger.error(f"Batch OCR processing failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Batch OCR processing failed"
+        )
+
+
 @router.post("/inference/detect")
 async def detect_components(
     file: UploadFile = File(...),
@@ -627,41 +906,12 @@ async def extract_board_id(
 ) -> dict:
     """Extract board ID from image using OCR - public endpoint for demo"""
     try:
-        # Read image
-        contents = await file.read()
-        image = Image.open(io.BytesIO(contents))
-        
         # Perform OCR to find board ID
-        if HAS_PYTESSERACT:
-            ocr_results = perform_ocr_tesseract(image)
-        else:
-            ocr_results = perform_ocr_fallback(image)
+        loop = asyncio.get_running_loop()
+        bundle = await loop.run_in_executor(_OCR_POOL, _ocr_upload, file.file)
+        ocr_results = bundle.results
         
-        # Look for board ID patterns (common patterns: XXXXX-XXXXX, REV, MODEL, etc.)
-        board_id = None
-        board_id_confidence = 0.0
-        board_id_bounds = None
-        
-        import re
-        for result in ocr_results:
-            text = result.text.upper()
-            
-            # Look for board ID patterns
-            patterns = [
-                r'([A-Z0-9]{4,}-[A-Z0-9]{4,})',  # XXXX-XXXX
-                r'(REV\s*[A-Z0-9]+)',  # REV A1
-                r'(MODEL\s*[\w-]+)',  # MODEL XXXX
-                r'([A-Z0-9]{6,}-[A-Z0-9]{1,})',  # Extended format
-            ]
-            
-            for pattern in patterns:
-                match = re.search(pattern, text)
-                if match:
-                    potential_id = match.group(1)
-                    if result.confidence > board_id_confidence:
-                        board_id = potential_id
-                        board_id_confidence = result.confidence
-                        board_id_bounds = result.bbox
+        board_id, board_id_confidence, board_id_bounds = find_board_id(ocr_results)
         
         return {
             "status": "success",
@@ -687,33 +937,12 @@ async def match_detected_components(
 ) -> dict:
     """Match detected components with OCR labels"""
     try:
-        # Read image
-        contents = await file.read()
-        image = Image.open(io.BytesIO(contents))
-        
         # Perform OCR to get all text
-        if HAS_PYTESSERACT:
-            ocr_results = perform_ocr_tesseract(image)
-        else:
-            ocr_results = perform_ocr_fallback(image)
-        
-        # Extract all OCR text
-        ocr_texts = [r.text for r in ocr_results]
-        
-        # In production, get detections from ML model
-        # For now, extract reference designators from OCR
-        matches = []
-        
-        for result in ocr_results:
-            ref_des = extract_reference_designator(result.text)
-            if ref_des:
-                matches.append({
-                    "refDes": ref_des,
-                    "partNumber": None,
-                    "marking": result.text,
-                    "confidence": result.confidence,
-                    "bbox": result.bbox,
-                })
+        loop = asyncio.get_running_loop()
+        bundle = await loop.run_in_executor(_OCR_POOL, _ocr_upload, file.file)
+        ocr_results = bundle.results
+        
+        matches = match_components(ocr_results)
         
         logger.info(f"Matched {len(matches)} components")
         
@@ -732,6 +961,45 @@ async def match_detected_components(
         )
 
 
+@router.post("/inference/analyze-all")
+async def analyze_all(
+    file: UploadFile = File(...),
+    top_k: int = Query(OCR_MAX_REGIONS, ge=1, le=OCR_MAX_REGIONS),
+    db: Session = Depends(get_db),
+) -> dict:
+    """Text regions, board ID and component matches from a single OCR pass - public endpoint for demo"""
+    try:
+        loop = asyncio.get_running_loop()
+        bundle = await loop.run_in_executor(_OCR_POOL, _ocr_upload, file.file)
+        ocr_results = bundle.results
+        
+        board_id, board_id_confidence, board_id_bounds = find_board_id(ocr_results)
+        matches = match_components(ocr_results)
+        text_regions = top_regions(ocr_results, top_k)
+        
+        return {
+            "status": "success",
+            "text_regions": text_regions,
+            "total_regions": len(text_regions),
+            "board_id": {
+                "board_id": board_id,
+                "confidence": board_id_confidence,
+                "bounds": board_id_bounds,
+            },
+            "matches": matches,
+            "total_matches": len(matches),
+            "image_size": {"width": bundle.image_size[0], "height": bundle.image_size[1]},
+            "algorithm": OCR_ALGORITHM,
+        }
+    
+    except Exception as e:
+        logger.error(f"Combined analysis failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Combined analysis failed"
+        )
+
+
 @router.post("/inference/quality-check")
 async def check_image_quality(
     file: UploadFile = File(...),
@@ -740,28 +1008,20 @@ async def check_image_quality(
 ) -> dict:
     """Check image quality for scanning"""
     try:
-        import numpy as np
-        
-        contents = await file.read()
-        image = Image.open(io.BytesIO(contents))
-        
-        # Convert to numpy array for analysis
-        img_array = np.array(image.convert('L'), dtype=np.float32)
-        
-        # Calculate blur score using Laplacian variance
-        from scipy import signal
-        kernel = np.array([
-            [0, -1, 0],
-            [-1, 4, -1],
-            [0, -1, 0]
-        ], dtype=np.float32)
-        
-        blurred = signal.convolve2d(img_array, kernel, mode='same', boundary='symm')
-        blur_score = float(np.var(blurred)) / 5000.0  # Normalize
+        # Single decode straight to uint8 gray; Laplacian widens to CV_32F itself
+        loop = asyncio.get_running_loop()
+        gray = await loop.run_in_executor(None, _decode_upload_gray, file.file)
+        height, width = gray.shape
+        
+        # Calculate blur score using Laplacian variance (OpenCV's SIMD filter,
+        # mirrored borders; mean and std-dev in a single pass)
+        laplacian = cv2.Laplacian(gray, cv2.CV_32F, ksize=1, borderType=cv2.BORDER_REFLECT)
+        _, std = cv2.meanStdDev(laplacian)
+        blur_score = float(std[0, 0]) ** 2 / 5000.0  # Normalize
         blur_score = min(1.0, max(0.0, blur_score))  # Clamp to 0-1
         
         # Calculate exposure quality (brightness)
-        mean_brightness = float(np.mean(img_array)) / 255.0
+        mean_brightness = cv2.mean(gray)[0] / 255.0
         exposure_quality = 1.0 - abs(0.5 - mean_brightness)  # Optimal at 0.5
         
         # Motion score (simplified - check if image has good detail)
@@ -773,15 +1033,9 @@ async def check_image_quality(
             "motion_score": motion_score,
             "exposure_quality": exposure_quality,
             "overall_quality": (blur_score + motion_score + exposure_quality) / 3.0,
-            "image_size": {"width": image.width, "height": image.height},
+            "image_size": {"width": width, "height": height},
         }
     
-    except ImportError:
-        logger.warning("scipy not available for quality analysis")
-        return {
-            "status": "error",
-            "message": "Image quality check requires scipy library",
-        }
     except Exception as e:
         logger.error(f"Quality check failed: {str(e)}")
         raise HTTPException(
@@ -3,14 +3,19 @@ services/api/app/routers/scans.py
 Scan management: capture, stitch, and storage endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+from fastapi import APIRouter, BackgroundTasks, Depends, UploadFile, File, Form
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
-import uuid
 
-from app.db.orm_models import User, Board, BoardScan, ScanFrame, Upload
-from app.db.session import get_db
+from app.db.base import new_id
+from app.db.orm_models import User, Board, BoardScan, ScanFrame
+from app.db.session import SessionLocal, get_db
 from app.dependencies import get_current_user
 from app.storage.image_manager import ImageManager
 from app.exceptions import NotFoundError, ValidationError
@@ -18,6 +23,103 @@ from app.exceptions import NotFoundError, ValidationError
 router = APIRouter(prefix="/api/scans", tags=["scans"])
 image_manager = ImageManager()
 
+# Frames written to disk concurrently per upload (bounds open files and memory)
+FRAME_SAVE_CONCURRENCY = 8
+
+# Threads scoring frames after upload; OpenCV releases the GIL while it works
+_QUALITY_POOL = ThreadPoolExecutor(max_workers=FRAME_SAVE_CONCURRENCY)
+
+# Columns behind _frame_out, selected directly instead of loading ScanFrame objects
+_FRAME_COLUMNS = (
+    ScanFrame.order,
+    ScanFrame.image_path,
+    ScanFrame.blur_score,
+    ScanFrame.motion_score,
+    ScanFrame.exposure_quality,
+)
+
+# Scan list entries in their API shape
+_SCAN_LIST_COLUMNS = (
+    BoardScan.id,
+    BoardScan.side,
+    BoardScan.status,
+    BoardScan.frames_collected,
+    BoardScan.quality_score,
+    BoardScan.stitched_image_path.label("stitched_image_url"),
+    BoardScan.created_at,
+)
+
+
+def _frame_quality(disk_path: str) -> Optional[dict]:
+    """Blur, motion and exposure scores for one frame (as /inference/quality-check)"""
+    gray = cv2.imread(disk_path, cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        return None
+
+    laplacian = cv2.Laplacian(gray, cv2.CV_32F, ksize=1, borderType=cv2.BORDER_REFLECT)
+    _, std = cv2.meanStdDev(laplacian)
+    blur_score = min(1.0, max(0.0, float(std[0, 0]) ** 2 / 5000.0))
+    exposure_quality = 1.0 - abs(0.5 - cv2.mean(gray)[0] / 255.0)
+    motion_score = max(0.5, blur_score)  # Simplified
+
+    return {
+        "blur_score": blur_score,
+        "motion_score": motion_score,
+        "exposure_quality": exposure_quality,
+        "quality_score": (blur_score + motion_score + exposure_quality) / 3.0,
+    }
+
+
+def compute_quality_metrics(frame_ids: List[str], frame_paths: List[str]) -> None:
+    """Score a scan's stored frames and write the metrics in one bulk UPDATE"""
+    disk_paths = [
+        str(image_manager.storage_path / path.removeprefix("/storage/"))
+        for path in frame_paths
+    ]
+    metrics = _QUALITY_POOL.map(_frame_quality, disk_paths)
+    rows = [
+        {"id": frame_id, **values}
+        for frame_id, values in zip(frame_ids, metrics)
+        if values is not None
+    ]
+    if not rows:
+        return
+
+    db = SessionLocal()
+    try:
+        db.execute(update(ScanFrame), rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _frame_out(frame) -> dict:
+    """API shape of a stored scan frame (a ScanFrame or a row of _FRAME_COLUMNS)"""
+    return {
+        "index": frame.order,
+        "image_url": frame.image_path,
+        "quality_metrics": {
+            "blur_score": frame.blur_score,
+            "motion_score": frame.motion_score,
+            "exposure_quality": frame.exposure_quality,
+        },
+    }
+
+
+async def get_owned_scan(
+    scan_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> BoardScan:
+    """Scan `scan_id` if it belongs to the current user (resolved once per request)"""
+    scan = db.scalars(
+        select(BoardScan).where(BoardScan.id == scan_id, BoardScan.user_id == current_user.id)
+    ).first()
+    
+    if not scan:
+        raise NotFoundError(f"Scan '{scan_id}' not found")
+    return scan
+
 
 class ScanFrameData:
     """Frame data model for uploads"""
@@ -29,12 +131,12 @@ class ScanFrameData:
 
 @router.post("/upload")
 async def upload_scan(
+    background: BackgroundTasks,
     board_id: str = Form(...),
     side: str = Form(...),  # "front" or "back"
     frames: List[UploadFile] = File(...),
     stitch_quality: float = Form(default=0.85),
     stitched_image: Optional[UploadFile] = File(None),
-    coverage_percentage: float = Form(default=0.0),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> dict:
@@ -47,7 +149,6 @@ async def upload_scan(
     - frames: List of frame images (JPEG/PNG)
     - stitch_quality: Quality score of stitching (0-1)
     - stitched_image: Optional pre-stitched panorama
-    - coverage_percentage: Estimated coverage of board surface
     
     **Returns:**
     - scan_id: UUID of the created scan session
@@ -69,8 +170,8 @@ async def upload_scan(
         raise ValidationError("Maximum 100 frames per scan allowed")
     
     # Get or create board
-    board = db.query(Board).filter(
-        (Board.board_id == board_id) & (Board.user_id == current_user.id)
+    board = db.scalars(
+        select(Board).where(Board.board_id == board_id, Board.user_id == current_user.id)
     ).first()
     
     if not board:
@@ -85,65 +186,61 @@ async def upload_scan(
         db.flush()
     
     # Create scan session
-    scan_id = str(uuid.uuid4())
     scan_session = BoardScan(
-        id=scan_id,
         board_id=board.id,
         user_id=current_user.id,
         side=side,
         status="completed",
         frames_collected=len(frames),
         quality_score=stitch_quality,
-        coverage_percentage=coverage_percentage,
-        metadata={
-            "upload_time": datetime.utcnow().isoformat(),
-            "frame_count": len(frames),
-            "board_id_string": board_id,
-        }
     )
     db.add(scan_session)
     db.flush()
+    scan_id = scan_session.id
     
     # Process stitched image if provided
     stitched_image_path = None
     if stitched_image:
         stitched_path = await image_manager.save_uploaded_file(
             stitched_image,
-            category="stitched",
-            user_id=current_user.id
+            subfolder=f"stitched/{current_user.id}",
         )
         stitched_image_path = stitched_path
         scan_session.stitched_image_path = stitched_path
     
-    # Store individual frames
-    frame_paths = []
-    for idx, frame_file in enumerate(frames):
-        try:
-            frame_path = await image_manager.save_uploaded_file(
+    # Store individual frames concurrently; gather keeps them in upload order
+    frame_slots = asyncio.Semaphore(FRAME_SAVE_CONCURRENCY)
+    
+    async def save_frame(frame_file: UploadFile) -> str:
+        async with frame_slots:
+            return await image_manager.save_uploaded_file(
                 frame_file,
-                category="frames",
-                user_id=current_user.id
-            )
-            frame_paths.append(frame_path)
-            
-            # Create ScanFrame record
-            scan_frame = ScanFrame(
-                id=str(uuid.uuid4()),
-                scan_id=scan_id,
-                frame_index=idx,
-                image_url=frame_path,
-                quality_metrics={
-                    "blur_score": 0.85,  # TODO: Calculate from frame
-                    "motion_score": 0.90,
-                    "exposure_quality": 0.88,
-                }
+                subfolder=f"frames/{current_user.id}",
             )
-            db.add(scan_frame)
-        except Exception as e:
-            raise ValidationError(f"Failed to save frame {idx}: {str(e)}")
+    
+    saved = await asyncio.gather(*(save_frame(f) for f in frames), return_exceptions=True)
+    for idx, result in enumerate(saved):
+        if isinstance(result, Exception):
+            raise ValidationError(f"Failed to save frame {idx}: {str(result)}")
+    frame_paths = list(saved)
+    
+    # Insert all ScanFrame rows in one executemany, bypassing the unit of work;
+    # quality metrics stay null until the background job scores the frames
+    frame_ids = [new_id() for _ in frame_paths]
+    db.bulk_insert_mappings(ScanFrame, [
+        {
+            "id": frame_id,
+            "scan_id": scan_id,
+            "order": idx,
+            "image_path": frame_path,
+        }
+        for idx, (frame_id, frame_path) in enumerate(zip(frame_ids, frame_paths))
+    ])
     
     db.commit()
     
+    background.add_task(compute_quality_metrics, frame_ids, frame_paths)
+    
     return {
         "status": "success",
         "scan_id": scan_id,
@@ -152,7 +249,6 @@ async def upload_scan(
         "frames_saved": len(frame_paths),
         "stitched_image_url": stitched_image_path,
         "quality_score": stitch_quality,
-        "coverage_percentage": coverage_percentage,
         "created_at": datetime.utcnow().isoformat(),
     }
 
@@ -175,39 +271,28 @@ async def get_board_scans(
     - scans: List of scan sessions with metadata
     """
     
-    board = db.query(Board).filter(
-        (Board.board_id == board_id) & (Board.user_id == current_user.id)
-    ).first()
+    board_pk = db.scalar(
+        select(Board.id).where(Board.board_id == board_id, Board.user_id == current_user.id)
+    )
     
-    if not board:
+    if not board_pk:
         raise NotFoundError(f"Board '{board_id}' not found")
     
-    query = db.query(BoardScan).filter(BoardScan.board_id == board.id)
+    stmt = select(*_SCAN_LIST_COLUMNS).where(BoardScan.board_id == board_pk)
     
     if side:
         if side not in ["front", "back"]:
             raise ValidationError("side must be 'front' or 'back'")
-        query = query.filter(BoardScan.side == side)
+        stmt = stmt.where(BoardScan.side == side)
     
-    scans = query.order_by(BoardScan.created_at.desc()).all()
+    # Rows come back as mappings already in the response shape
+    scans = [dict(row) for row in db.execute(stmt.order_by(BoardScan.created_at.desc())).mappings()]
     
     return {
         "status": "success",
         "board_id": board_id,
         "total_scans": len(scans),
-        "scans": [
-            {
-                "id": scan.id,
-                "side": scan.side,
-                "status": scan.status,
-                "frames_collected": scan.frames_collected,
-                "quality_score": scan.quality_score,
-                "coverage_percentage": scan.coverage_percentage,
-                "stitched_image_url": scan.stitched_image_path,
-                "created_at": scan.created_at.isoformat(),
-            }
-            for scan in scans
-        ]
+        "scans": scans,
     }
 
 
@@ -215,19 +300,14 @@ async def get_board_scans(
 async def get_scan(
     scan_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    scan: BoardScan = Depends(get_owned_scan),
 ) -> dict:
     """Get details of a specific scan session"""
     
-    scan = db.query(BoardScan).filter(
-        (BoardScan.id == scan_id) & (BoardScan.user_id == current_user.id)
-    ).first()
-    
-    if not scan:
-        raise NotFoundError(f"Scan '{scan_id}' not found")
-    
     # Get frames for this scan
-    frames = db.query(ScanFrame).filter(ScanFrame.scan_id == scan_id).order_by(ScanFrame.frame_index).all()
+    frames = db.execute(
+        select(*_FRAME_COLUMNS).where(ScanFrame.scan_id == scan_id).order_by(ScanFrame.order)
+    ).all()
     
     return {
         "status": "success",
@@ -235,16 +315,8 @@ async def get_scan(
         "side": scan.side,
         "frames_collected": scan.frames_collected,
         "quality_score": scan.quality_score,
-        "coverage_percentage": scan.coverage_percentage,
         "stitched_image_url": scan.stitched_image_path,
-        "frames": [
-            {
-                "index": frame.frame_index,
-                "image_url": frame.image_url,
-                "quality_metrics": frame.quality_metrics,
-            }
-            for frame in frames
-        ],
+        "frames": [_frame_out(frame) for frame in frames],
         "created_at": scan.created_at.isoformat(),
     }
 
@@ -253,30 +325,23 @@ async def get_scan(
 async def delete_scan(
     scan_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    scan: BoardScan = Depends(get_owned_scan),
 ) -> dict:
     """Delete a scan session and its associated frames"""
     
-    scan = db.query(BoardScan).filter(
-        (BoardScan.id == scan_id) & (BoardScan.user_id == current_user.id)
-    ).first()
-    
-    if not scan:
-        raise NotFoundError(f"Scan '{scan_id}' not found")
-    
-    # Delete associated frames
-    frames = db.query(ScanFrame).filter(ScanFrame.scan_id == scan_id).all()
-    for frame in frames:
-        db.delete(frame)
-    
-    # Delete the scan
-    db.delete(scan)
+    # Delete associated frames, then the scan, with one DELETE statement each
+    # (db.delete(scan) would load every frame to cascade the delete)
+    no_sync = {"synchronize_session": False}
+    frames_deleted = db.execute(
+        delete(ScanFrame).where(ScanFrame.scan_id == scan_id), execution_options=no_sync
+    ).rowcount
+    db.execute(delete(BoardScan).where(BoardScan.id == scan_id), execution_options=no_sync)
     db.commit()
     
     return {
         "status": "success",
         "message": f"Scan '{scan_id}' deleted",
-        "frames_deleted": len(frames),
+        "frames_deleted": frames_deleted,
     }
 
 
@@ -286,7 +351,7 @@ async def get_scan_frames(
     skip: int = 0,
     limit: int = 10,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    scan: BoardScan = Depends(get_owned_scan),
 ) -> dict:
     """
     Get paginated frames for a scan
@@ -301,32 +366,29 @@ async def get_scan_frames(
     - total: Total frame count
     """
     
-    scan = db.query(BoardScan).filter(
-        (BoardScan.id == scan_id) & (BoardScan.user_id == current_user.id)
-    ).first()
-    
-    if not scan:
-        raise NotFoundError(f"Scan '{scan_id}' not found")
-    
-    frames = db.query(ScanFrame).filter(
-        ScanFrame.scan_id == scan_id
-    ).order_by(ScanFrame.frame_index).offset(skip).limit(limit).all()
-    
-    total = db.query(ScanFrame).filter(ScanFrame.scan_id == scan_id).count()
+    # The window count rides along with the page, so one round-trip serves both
+    rows = db.execute(
+        select(*_FRAME_COLUMNS, func.count().over().label("_total"))
+        .where(ScanFrame.scan_id == scan_id)
+        .order_by(ScanFrame.order)
+        .offset(skip)
+        .limit(limit)
+    ).all()
+    
+    if rows:
+        total = rows[0]._total
+    elif skip:
+        # Paged past the end: no row carries the count, so fetch it directly
+        total = db.scalar(select(func.count()).where(ScanFrame.scan_id == scan_id))
+    else:
+        total = 0
     
     return {
         "status": "success",
         "scan_id": scan_id,
         "total": total,
-        "returned": len(frames),
+        "returned": len(rows),
         "skip": skip,
         "limit": limit,
-        "frames": [
-            {
-                "index": frame.frame_index,
-                "image_url": frame.image_url,
-                "quality_metrics": frame.quality_metrics,
-            }
-            for frame in frames
-        ]
+        "frames": [_frame_out(row) for row in rows]
     }
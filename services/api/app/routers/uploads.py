@@ -3,18 +3,94 @@ services/api/app/routers/uploads.py
 File upload endpoints
 """
 
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException
+from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Request, Response
 from fastapi.responses import JSONResponse, FileResponse
 import os
+import stat
+import functools
 import uuid
 import json
+import hashlib
 from datetime import datetime
+from typing import AsyncIterator
+
+import aiofiles
 
 router = APIRouter()
 
 STORAGE_PATH = os.getenv("STORAGE_PATH", "./storage")
 os.makedirs(STORAGE_PATH, exist_ok=True)
 
+# Resolved storage root; served paths must stay inside it after symlinks
+_STORAGE_ROOT = os.path.realpath(STORAGE_PATH)
+
+# Uploads are written to disk in 1 MiB chunks instead of buffered whole
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Internal reverse-proxy location mapped onto STORAGE_PATH (e.g. nginx
+# `location /_internal_uploads/ { internal; alias /storage/; }`). When set,
+# files are handed off with X-Accel-Redirect so the proxy sendfile()s them.
+UPLOADS_ACCEL_REDIRECT = os.getenv("UPLOADS_ACCEL_REDIRECT", "")
+
+UPLOAD_MEDIA_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+
+
+# Files up to this size are served from an in-process LRU instead of disk
+SMALL_FILE_CACHE_MAX_BYTES = 64 * 1024
+
+
+@functools.lru_cache(maxsize=1024)
+def _read_small_file(filepath: str, mtime_ns: int, size: int) -> bytes:
+    """Read a small stored file; mtime and size in the key drop stale entries"""
+    with open(filepath, "rb") as f:
+        return f.read()
+
+
+async def _upload_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        yield chunk
+
+
+async def _store_stream(chunks: AsyncIterator[bytes], original_filename: str) -> tuple[str, str, str, int]:
+    """Stream bytes to storage under their SHA-256, keeping the original extension
+
+    The stream is hashed while it is written to a temporary file, which is then
+    renamed to `<sha256><ext>`; if that file already exists the copy is dropped
+    and the existing file's mtime refreshed, so identical uploads are stored once. Returns (digest, filename, filepath, size).
+    """
+    file_ext = os.path.splitext(original_filename or "")[1]
+    tmp_path = os.path.join(STORAGE_PATH, f".{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(tmp_path, "wb") as f:
+            async for chunk in chunks:
+                digest.update(chunk)
+                await f.write(chunk)
+                size += len(chunk)
+
+        file_id = digest.hexdigest()
+        filename = f"{file_id}{file_ext}"
+        filepath = os.path.join(STORAGE_PATH, filename)
+        try:
+            # Duplicate content: refresh the stored copy's mtime so age-based
+            # cleanup treats it as a fresh upload
+            os.utime(filepath)
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return file_id, filename, filepath, size
+
 
 @router.post("/uploads/image")
 async def upload_image(
@@ -23,16 +99,8 @@ async def upload_image(
 ):
     """Upload an image file"""
     try:
-        # Generate unique filename
-        file_ext = os.path.splitext(file.filename)[1]
-        unique_id = str(uuid.uuid4())
-        filename = f"{unique_id}{file_ext}"
-        filepath = os.path.join(STORAGE_PATH, filename)
-
-        # Save file
-        content = await file.read()
-        with open(filepath, "wb") as f:
-            f.write(content)
+        # Stream file to disk, named by content digest
+        unique_id, filename, filepath, size = await _store_stream(_upload_chunks(file), file.filename)
 
         # Parse metadata if provided
         meta = {}
@@ -43,7 +111,7 @@ async def upload_image(
             "id": unique_id,
             "filename": filename,
             "filepath": filepath,
-            "size": len(content),
+            "size": size,
             "uploadedAt": datetime.utcnow().isoformat(),
             "metadata": meta,
         }
@@ -55,6 +123,28 @@ async def upload_image(
         )
 
 
+@router.post("/uploads/image/stream")
+async def upload_image_stream(request: Request, filename: str = ""):
+    """Upload an image sent as the raw request body (no multipart parsing or spooling)"""
+    try:
+        unique_id, stored_name, filepath, size = await _store_stream(request.stream(), filename)
+
+        return {
+            "id": unique_id,
+            "filename": stored_name,
+            "filepath": filepath,
+            "size": size,
+            "uploadedAt": datetime.utcnow().isoformat(),
+            "metadata": {},
+        }
+
+    except Exception as e:
+        return JSONResponse(
+            status_code=400,
+            content={"error": str(e)},
+        )
+
+
 @router.get("/uploads/info/{file_id}")
 async def get_upload_info(file_id: str):
     """Get information about an uploaded file"""
@@ -72,22 +162,34 @@ async def serve_upload(filename: str):
     if ".." in filename or "/" in filename or "\\" in filename:
         raise HTTPException(status_code=400, detail="Invalid filename")
     
-    filepath = os.path.join(STORAGE_PATH, filename)
+    # Resolve symlinks before anything touches the file or the read cache
+    filepath = os.path.realpath(os.path.join(_STORAGE_ROOT, filename))
+    if os.path.commonpath([_STORAGE_ROOT, filepath]) != _STORAGE_ROOT:
+        raise HTTPException(status_code=404, detail="File not found")
     
-    # Check if file exists
-    if not os.path.exists(filepath) or not os.path.isfile(filepath):
+    # One stat both checks existence and feeds the response
+    try:
+        st = os.stat(filepath)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    if not stat.S_ISREG(st.st_mode):
         raise HTTPException(status_code=404, detail="File not found")
     
     # Determine media type
     _, ext = os.path.splitext(filename)
-    media_type = "application/octet-stream"
-    if ext.lower() in [".jpg", ".jpeg"]:
-        media_type = "image/jpeg"
-    elif ext.lower() == ".png":
-        media_type = "image/png"
-    elif ext.lower() == ".gif":
-        media_type = "image/gif"
-    elif ext.lower() == ".webp":
-        media_type = "image/webp"
+    media_type = UPLOAD_MEDIA_TYPES.get(ext.lower(), "application/octet-stream")
+    
+    if UPLOADS_ACCEL_REDIRECT:
+        # The proxy serves the bytes; Python never reads the file
+        return Response(
+            headers={"X-Accel-Redirect": f"{UPLOADS_ACCEL_REDIRECT.rstrip('/')}/{filename}"},
+            media_type=media_type,
+        )
+    
+    if st.st_size <= SMALL_FILE_CACHE_MAX_BYTES:
+        return Response(
+            content=_read_small_file(filepath, st.st_mtime_ns, st.st_size),
+            media_type=media_type,
+        )
     
-    return FileResponse(filepath, media_type=media_type)
+    return FileResponse(filepath, media_type=media_type, stat_result=st)
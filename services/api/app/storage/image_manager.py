@@ -5,10 +5,14 @@ Image storage and processing management
 
 import os
 import uuid
+import hashlib
 from pathlib import Path
+import aiofiles
 from fastapi import UploadFile
 from PIL import Image
-from io import BytesIO
+
+# Uploads are copied to disk in 1 MiB chunks rather than read whole into memory
+UPLOAD_CHUNK_SIZE = 1 << 20
 
 
 class ImageManager:
@@ -16,25 +20,43 @@ class ImageManager:
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
 
-    def save_uploaded_file(self, file: UploadFile, subfolder: str = "") -> str:
-        """Save uploaded file and return relative path"""
+    async def save_uploaded_file(self, file: UploadFile, subfolder: str = "") -> str:
+        """Stream uploaded file to disk under its SHA-256 and return relative path
+
+        Identical content in the same subfolder is stored once.
+        """
+        tmp_path = None
         try:
-            filename = f"{uuid.uuid4()}_{file.filename}"
             if subfolder:
                 folder = self.storage_path / subfolder
                 folder.mkdir(parents=True, exist_ok=True)
             else:
                 folder = self.storage_path
 
+            # Hash while writing to a temporary file, then rename it to the digest
+            tmp_path = folder / f".{uuid.uuid4().hex}.part"
+            digest = hashlib.sha256()
+            async with aiofiles.open(tmp_path, "wb") as buffer:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    digest.update(chunk)
+                    await buffer.write(chunk)
+
+            filename = f"{digest.hexdigest()}{Path(file.filename or '').suffix}"
             filepath = folder / filename
-            with open(filepath, "wb") as buffer:
-                contents = file.file.read()
-                buffer.write(contents)
+            try:
+                # Duplicate content: refresh the stored copy's mtime so
+                # cleanup_old_files treats it as a fresh upload
+                os.utime(filepath)
+                tmp_path.unlink()
+            except FileNotFoundError:
+                os.replace(tmp_path, filepath)
 
             # Return relative path for URL
             return f"/storage/{subfolder}/{filename}" if subfolder else f"/storage/{filename}"
 
         except Exception as e:
+            if tmp_path is not None and tmp_path.exists():
+                tmp_path.unlink()
             raise Exception(f"Failed to save file: {str(e)}")
 
     def save_image_bytes(self, image_bytes: bytes, filename: str = None, subfolder: str = "") -> str:
@@ -62,14 +84,19 @@ class ImageManager:
         """Create thumbnail and return path"""
         try:
             full_path = self.storage_path / image_path.lstrip("/storage/")
-            img = Image.open(full_path)
+            thumb_path = full_path.parent / f"{full_path.stem}_thumb.jpg"
+
+            with Image.open(full_path) as img:
+                # JPEGs decode straight at a 1/2-1/8 DCT scale near the target
+                # size; a no-op for other formats
+                img.draft("RGB", (max_width, max_width))
 
-            # Resize maintaining aspect ratio
-            img.thumbnail((max_width, max_width))
+                # Resize maintaining aspect ratio
+                img.thumbnail((max_width, max_width), Image.Resampling.LANCZOS)
 
-            # Save thumbnail
-            thumb_path = full_path.parent / f"{full_path.stem}_thumb{full_path.suffix}"
-            img.save(thumb_path)
+                if img.mode not in ("RGB", "L"):
+                    img = img.convert("RGB")
+                img.save(thumb_path, "JPEG", quality=80, optimize=True)
 
             return str(thumb_path.relative_to(self.storage_path.parent))
 
@@ -103,12 +130,23 @@ class ImageManager:
         cutoff_time = current_time - (days * 24 * 60 * 60)
 
         try:
-            for root, dirs, files in os.walk(self.storage_path):
-                for file in files:
-                    filepath = Path(root) / file
-                    if filepath.stat().st_mtime < cutoff_time:
-                        filepath.unlink()
-                        deleted_count += 1
+            for path in _iter_files_older_than(self.storage_path, cutoff_time):
+                os.unlink(path)
+                deleted_count += 1
             return deleted_count
         except Exception as e:
             raise Exception(f"Failed to cleanup old files: {str(e)}")
+
+
+def _iter_files_older_than(root, cutoff_time: float):
+    """Yield paths of files under `root` last modified before `cutoff_time`
+
+    Iterates os.scandir entries directly (file types come from the directory
+    listing), without os.walk's per-directory name lists or Path objects.
+    """
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_files_older_than(entry.path, cutoff_time)
+            elif entry.stat(follow_symlinks=False).st_mtime < cutoff_time:
+                yield entry.path
@@ -0,0 +1,55 @@
+"""
+services/api/scripts/bench_bcrypt.py
+Benchmark bcrypt cost factors to choose BCRYPT_COST for this hardware
+
+Usage:
+    python scripts/bench_bcrypt.py [--min 10] [--max 14] [--samples 20]
+
+Choose the highest cost whose p95 is at or below the target (default 250 ms)
+and set it as BCRYPT_COST in the API environment.
+"""
+
+import argparse
+import statistics
+import time
+
+import bcrypt
+
+
+def bench_cost(cost: int, samples: int) -> list[float]:
+    """Return per-hash timings in milliseconds for a given cost"""
+    password = b"benchmark-password"
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.hashpw(password, bcrypt.gensalt(rounds=cost))
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bcrypt cost factors")
+    parser.add_argument("--min", type=int, default=10, help="Lowest cost to test")
+    parser.add_argument("--max", type=int, default=14, help="Highest cost to test")
+    parser.add_argument("--samples", type=int, default=20, help="Hashes per cost")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="p95 budget in ms")
+    args = parser.parse_args()
+
+    recommended = None
+    print(f"{'cost':>4}  {'mean ms':>9}  {'p95 ms':>9}")
+    for cost in range(args.min, args.max + 1):
+        timings = sorted(bench_cost(cost, args.samples))
+        mean = statistics.mean(timings)
+        p95 = timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))]
+        print(f"{cost:>4}  {mean:>9.1f}  {p95:>9.1f}")
+        if p95 <= args.target_ms:
+            recommended = cost
+
+    if recommended is None:
+        print(f"\nNo cost in range meets p95 <= {args.target_ms:.0f} ms; use BCRYPT_COST={args.min}")
+    else:
+        print(f"\nRecommended: BCRYPT_COST={recommended}")
+
+
+if __name__ == "__main__":
+    main()
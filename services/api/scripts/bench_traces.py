@@ -0,0 +1,86 @@
+"""
+services/api/scripts/bench_traces.py
+Benchmark /enhance-with-stages throughput through the trace process pool
+
+Usage:
+    python scripts/bench_traces.py [--workers N] [--jobs 32] [--size 1600x1200]
+
+Runs the same jobs through three pool setups so TRACE_WORKERS can be tuned:
+  fork        default fork context, branch threads and OpenCV threads on
+  opencv1     forkserver, cv2.setNumThreads(1), branch threads still on
+  serving     the pool the API starts (forkserver, one OpenCV thread,
+              branches inline)
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.routers.traces import _enhance_with_stages_bytes, _init_trace_worker  # noqa: E402
+
+
+def _init_opencv_only() -> None:
+    cv2.setNumThreads(1)
+
+
+SETUPS = {
+    "fork": ("fork", None),
+    "opencv1": ("forkserver", _init_opencv_only),
+    "serving": ("forkserver", _init_trace_worker),
+}
+
+
+def synthetic_board(width: int, height: int) -> bytes:
+    """A PNG with noise, traces and colored blocks, so every stage has work"""
+    rng = np.random.default_rng(0)
+    image = cv2.GaussianBlur(rng.integers(0, 256, (height, width, 3), dtype=np.uint8), (0, 0), 3)
+    for i in range(0, width, 40):
+        cv2.line(image, (i, 0), (width - i, height), (40, 180, 60), 3)
+    for i in range(12):
+        x, y = rng.integers(0, width - 120), rng.integers(0, height - 80)
+        cv2.rectangle(image, (int(x), int(y)), (int(x) + 120, int(y) + 80), (0, 120, 255), -1)
+    ok, encoded = cv2.imencode(".png", image)
+    assert ok
+    return encoded.tobytes()
+
+
+def bench_setup(name: str, workers: int, jobs: int, contents: bytes) -> float:
+    """Return jobs per second after one warm-up job per worker"""
+    start_method, initializer = SETUPS[name]
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(start_method),
+        initializer=initializer,
+    ) as pool:
+        list(pool.map(_enhance_with_stages_bytes, [contents] * workers, [False] * workers))
+        start = time.perf_counter()
+        list(pool.map(_enhance_with_stages_bytes, [contents] * jobs, [False] * jobs))
+        return jobs / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the trace process pool")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Pool size (TRACE_WORKERS)")
+    parser.add_argument("--jobs", type=int, default=32, help="Timed jobs per setup")
+    parser.add_argument("--size", default="1600x1200", help="Synthetic image size WxH")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split("x"))
+    contents = synthetic_board(width, height)
+
+    print(f"{os.cpu_count()} CPUs, {args.workers} workers, {args.jobs} jobs of {args.size}")
+    print(f"{'setup':>8}  {'jobs/s':>8}")
+    for name in SETUPS:
+        print(f"{name:>8}  {bench_setup(name, args.workers, args.jobs, contents):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
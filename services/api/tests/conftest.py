@@ -0,0 +1,53 @@
+"""
+services/api/tests/conftest.py
+Shared fixtures: an isolated SQLite database and storage directory per run
+"""
+
+import os
+import tempfile
+
+import cv2
+import numpy as np
+import pytest
+
+# Point the app at throwaway storage before anything imports it
+_TMP = tempfile.mkdtemp(prefix="sasasight-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP}/test.db"
+os.environ["STORAGE_PATH"] = os.path.join(_TMP, "uploads")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.routers import scans  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    credentials = {"username": "tester", "password": "s3cret"}
+    client.post("/auth/register", json={**credentials, "email": "tester@example.com"})
+    token = client.post("/auth/login", json=credentials).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def scan_storage(tmp_path, monkeypatch):
+    """Store scan frames under a per-test directory"""
+    monkeypatch.setattr(scans.image_manager, "storage_path", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def png_bytes():
+    """Factory for small random grayscale PNGs, distinct per seed"""
+    def make(seed: int, size: int = 64) -> bytes:
+        pixels = np.random.default_rng(seed).integers(0, 256, (size, size), dtype=np.uint8)
+        ok, encoded = cv2.imencode(".png", pixels)
+        assert ok
+        return encoded.tobytes()
+    return make
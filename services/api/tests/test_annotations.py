@@ -0,0 +1,52 @@
+"""
+services/api/tests/test_annotations.py
+Drawing annotation revalidation
+"""
+
+import pytest
+
+from app.routers import annotations
+
+URL = "/api/boards/board-etag/drawings/front"
+
+
+@pytest.fixture(autouse=True)
+def empty_drawings():
+    annotations.drawing_annotations_db.clear()
+    yield
+    annotations.drawing_annotations_db.clear()
+
+
+def _save(client, *tools):
+    body = {"boardId": "board-etag", "side": "front", "annotations": [{"tool": t} for t in tools]}
+    assert client.post(URL, json=body).status_code == 200
+
+
+def test_matching_etag_returns_304_with_empty_body(client):
+    _save(client, "pen")
+    first = client.get(URL)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    revalidated = client.get(URL, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+
+
+def test_etag_changes_after_update(client):
+    _save(client, "pen")
+    etag = client.get(URL).headers["etag"]
+
+    _save(client, "pen", "rect")
+    refreshed = client.get(URL, headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != etag
+    assert [a["tool"] for a in refreshed.json()["annotations"]] == ["pen", "rect"]
+
+
+def test_missing_drawing_has_no_etag(client):
+    response = client.get(URL)
+    assert response.status_code == 200
+    assert response.json()["found"] is False
+    assert "etag" not in response.headers
@@ -0,0 +1,31 @@
+"""
+services/api/tests/test_auth.py
+Registration and login
+"""
+
+import pytest
+
+from app.routers import auth
+
+
+@pytest.fixture(params=["on_conflict", "select_then_insert"])
+def insert_path(request, monkeypatch):
+    """Run against the dialect ON CONFLICT insert and the generic fallback"""
+    if request.param == "select_then_insert":
+        monkeypatch.setattr(auth, "_INSERT_BY_DIALECT", {})
+    return request.param
+
+
+def test_register_rejects_duplicates(client, insert_path):
+    user = {"username": f"dup-{insert_path}", "email": f"{insert_path}@example.com", "password": "pw"}
+
+    created = client.post("/auth/register", json=user)
+    assert created.status_code == 200, created.text
+    assert created.json()["username"] == user["username"]
+
+    assert client.post("/auth/register", json=user).status_code == 422
+    same_email = {**user, "username": f"other-{insert_path}"}
+    assert client.post("/auth/register", json=same_email).status_code == 422
+
+    login = client.post("/auth/login", json={"username": user["username"], "password": "pw"})
+    assert login.status_code == 200
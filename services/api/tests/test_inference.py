@@ -0,0 +1,145 @@
+"""
+services/api/tests/test_inference.py
+OCR endpoints and result caching
+"""
+
+from collections import OrderedDict
+
+import pytest
+
+from app.routers import inference
+
+
+@pytest.fixture
+def flaky_ocr(monkeypatch):
+    """Tesseract stub that fails on its first call and finds one word afterwards"""
+    calls = []
+    word = {"text": "U1", "confidence": 0.9, "bbox": {"x": 0, "y": 0, "width": 4, "height": 4}}
+
+    def run(image, return_stages=False):
+        calls.append(image.shape)
+        if len(calls) == 1:
+            raise RuntimeError("tesseract crashed")
+        return [word], []
+
+    monkeypatch.setattr(inference, "HAS_OCR", True)
+    monkeypatch.setattr(inference, "_run_ocr_tesseract", run)
+    monkeypatch.setattr(inference, "_ocr_cache", OrderedDict())
+    return calls
+
+
+def test_failed_ocr_is_not_cached(flaky_ocr, png_bytes):
+    contents = png_bytes(3)
+
+    assert inference._ocr_and_cache(contents).results == []
+    assert [r["text"] for r in inference._ocr_and_cache(contents).results] == ["U1"]
+
+    # The successful run is cached
+    assert [r["text"] for r in inference._ocr_and_cache(contents).results] == ["U1"]
+    assert len(flaky_ocr) == 2
+
+
+def _ocr_rows(rows):
+    """An image_to_data dict from (page_num, text, conf, left) rows"""
+    return {
+        "page_num": [page for page, _, _, _ in rows],
+        "text": [text for _, text, _, _ in rows],
+        "conf": [conf for _, _, conf, _ in rows],
+        "left": [left for _, _, _, left in rows],
+        "top": [10] * len(rows),
+        "width": [20] * len(rows),
+        "height": [8] * len(rows),
+    }
+
+
+@pytest.fixture
+def batch_tesseract(monkeypatch):
+    """pytesseract stub answering a two-page list file; records the pages it was given"""
+    pages = []
+
+    def image_to_data(list_path, config=None, output_type=None):
+        with open(list_path) as f:
+            pages.extend(line for line in f.read().splitlines() if line)
+        return _ocr_rows([
+            (1, "R12", 90, 5),
+            (1, "x", 95, 30),    # too short
+            (2, "C5", 80, 5),
+            (2, "U7", 30, 30),   # low confidence
+            (2, "Q1", 85, 60),
+            (3, "ZZ9", 99, 5),   # no such page
+        ])
+
+    monkeypatch.setattr(inference, "HAS_TESSEROCR", False)
+    monkeypatch.setattr(inference, "HAS_PYTESSERACT", True)
+    monkeypatch.setattr(inference.pytesseract, "image_to_data", image_to_data)
+    monkeypatch.setattr(
+        inference, "preprocess_image_for_ocr",
+        lambda image, return_stages=False: (image, [], 1.0),
+    )
+    return pages
+
+
+def _batch_files(png_bytes, count):
+    return [("files", (f"page{i}.png", png_bytes(i), "image/png")) for i in range(count)]
+
+
+def test_ocr_batch_splits_rows_by_page(client, batch_tesseract, png_bytes):
+    response = client.post("/api/inference/ocr-batch", files=_batch_files(png_bytes, 2))
+
+    assert response.status_code == 200, response.text
+    assert len(batch_tesseract) == 2
+    first, second = response.json()["results"]
+    assert first["filename"] == "page0.png"
+    assert [r["text"] for r in first["text_regions"]] == ["R12"]
+    assert [r["text"] for r in second["text_regions"]] == ["C5", "Q1"]
+    assert second["total_regions"] == 2
+
+
+def test_ocr_batch_top_k_keeps_most_confident(client, batch_tesseract, png_bytes):
+    response = client.post("/api/inference/ocr-batch?top_k=1", files=_batch_files(png_bytes, 2))
+
+    second = response.json()["results"][1]
+    assert [r["text"] for r in second["text_regions"]] == ["Q1"]
+    assert second["total_regions"] == 1
+
+
+def test_ocr_batch_rejects_too_many_files(client, monkeypatch, batch_tesseract, png_bytes):
+    monkeypatch.setattr(inference, "MAX_BATCH_FILES", 2)
+
+    response = client.post("/api/inference/ocr-batch", files=_batch_files(png_bytes, 3))
+
+    assert response.status_code == 400
+    assert batch_tesseract == []
+
+
+def test_analyze_all_top_k_truncates_regions_only(client, monkeypatch, png_bytes):
+    words = [
+        {"text": text, "confidence": conf, "bbox": {"x": x, "y": 0, "width": 10, "height": 8}}
+        for text, conf, x in [
+            ("8200-02020", 0.45, 0),
+            ("R12", 0.95, 20),
+            ("C5", 0.70, 40),
+            ("U7", 0.90, 60),
+        ]
+    ]
+    monkeypatch.setattr(inference, "HAS_OCR", True)
+    monkeypatch.setattr(inference, "_run_ocr_tesseract", lambda image, return_stages=False: (words, []))
+    monkeypatch.setattr(inference, "_ocr_cache", OrderedDict())
+
+    response = client.post(
+        "/api/inference/analyze-all?top_k=2",
+        files={"file": ("board.png", png_bytes(50), "image/png")},
+    )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    # Two most confident regions, in reading order
+    assert [r["text"] for r in body["text_regions"]] == ["R12", "U7"]
+    assert body["total_regions"] == 2
+    # Board ID detection still sees the low-confidence region
+    assert body["board_id"]["board_id"] == "8200-02020"
+
+
+def test_analyze_all_rejects_out_of_range_top_k(client, png_bytes):
+    files = {"file": ("board.png", png_bytes(51), "image/png")}
+    assert client.post("/api/inference/analyze-all?top_k=0", files=files).status_code == 422
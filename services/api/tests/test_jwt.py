@@ -0,0 +1,86 @@
+"""
+services/api/tests/test_jwt.py
+Verified-token cache in app.auth.jwt
+"""
+
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+import pytest
+
+from app.auth import jwt as auth_jwt
+from app.exceptions import UnauthorizedException
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(auth_jwt, "_token_cache", OrderedDict())
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    """Count signature verifications that reach PyJWT"""
+    calls = []
+    real_decode = auth_jwt.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth_jwt.jwt, "decode", counting_decode)
+    return calls
+
+
+def test_cache_hit_returns_same_payload(decode_calls):
+    token = auth_jwt.create_access_token({"sub": "user-1"})
+
+    first = auth_jwt.verify_access_token(token)
+    second = auth_jwt.verify_access_token(token)
+
+    assert first["sub"] == "user-1"
+    assert second is first
+    assert len(decode_calls) == 1
+
+
+def test_expired_token_rejected_even_when_cached(decode_calls):
+    token = auth_jwt.create_access_token({"sub": "user-1"}, expires_delta=timedelta(seconds=1))
+    payload = auth_jwt.verify_access_token(token)
+    assert auth_jwt._cache_key(token) in auth_jwt._token_cache
+
+    time.sleep(max(0.0, payload["exp"] - time.time()) + 0.05)
+
+    with pytest.raises(UnauthorizedException):
+        auth_jwt.verify_access_token(token)
+    assert auth_jwt._cache_key(token) not in auth_jwt._token_cache
+
+
+def test_tampered_token_never_hits_cache(decode_calls):
+    token = auth_jwt.create_access_token({"sub": "user-1"})
+    auth_jwt.verify_access_token(token)
+
+    header, payload, signature = token.split(".")
+    tampered = ".".join([header, payload, signature[:-2] + ("AA" if signature[-2:] != "AA" else "BB")])
+
+    for _ in range(2):
+        with pytest.raises(UnauthorizedException):
+            auth_jwt.verify_access_token(tampered)
+
+    # Both attempts went through full verification and left no cache entry
+    assert decode_calls.count(tampered) == 2
+    assert auth_jwt._cache_key(tampered) not in auth_jwt._token_cache
+
+
+def test_cache_eviction_is_bounded_lru(monkeypatch):
+    monkeypatch.setattr(auth_jwt, "TOKEN_CACHE_SIZE", 3)
+    tokens = [auth_jwt.create_access_token({"sub": f"user-{i}"}) for i in range(5)]
+
+    for token in tokens[:3]:
+        auth_jwt.verify_access_token(token)
+    auth_jwt.verify_access_token(tokens[0])  # most recently used now
+    for token in tokens[3:]:
+        auth_jwt.verify_access_token(token)
+
+    cached = set(auth_jwt._token_cache)
+    assert len(cached) == 3
+    assert cached == {auth_jwt._cache_key(t) for t in (tokens[0], tokens[3], tokens[4])}
@@ -0,0 +1,58 @@
+"""
+services/api/tests/test_scans.py
+Scan upload and retrieval endpoints
+"""
+
+
+def _upload(client, headers, frames, **form):
+    files = [("frames", (f"frame{i}.png", data, "image/png")) for i, data in enumerate(frames)]
+    data = {"board_id": "BOARD-1", "side": "front", **form}
+    return client.post("/api/scans/upload", data=data, files=files, headers=headers)
+
+
+def test_upload_scan_stores_frames(client, auth_headers, scan_storage, png_bytes):
+    frames = [png_bytes(seed) for seed in range(3)]
+    response = _upload(client, auth_headers, frames, stitch_quality="0.9")
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["status"] == "success"
+    assert body["frames_saved"] == 3
+    assert body["quality_score"] == 0.9
+
+    stored = sorted(p.name for p in (scan_storage / "frames").rglob("*.png"))
+    assert len(stored) == 3
+
+    scan = client.get(f"/api/scans/{body['scan_id']}", headers=auth_headers).json()
+    assert [frame["index"] for frame in scan["frames"]] == [0, 1, 2]
+
+
+def test_upload_scan_rejects_bad_side(client, auth_headers, scan_storage, png_bytes):
+    response = _upload(client, auth_headers, [png_bytes(0)], side="top")
+    assert response.status_code == 422
+
+
+def test_upload_scan_scores_frames_in_background(client, auth_headers, scan_storage, png_bytes):
+    # The second frame is not a decodable image, so it cannot be scored
+    frames = [png_bytes(10), b"not an image"]
+    body = _upload(client, auth_headers, frames).json()
+
+    # TestClient runs background tasks before returning the response
+    scan = client.get(f"/api/scans/{body['scan_id']}", headers=auth_headers).json()
+    scored, unreadable = (frame["quality_metrics"] for frame in scan["frames"])
+
+    assert 0.0 <= scored["blur_score"] <= 1.0
+    assert 0.5 <= scored["motion_score"] <= 1.0
+    assert 0.0 <= scored["exposure_quality"] <= 1.0
+    assert unreadable == {"blur_score": None, "motion_score": None, "exposure_quality": None}
+
+
+def test_scan_responses_do_not_report_coverage(client, auth_headers, scan_storage, png_bytes):
+    # Clients may still send the old form field; it is ignored, not echoed
+    body = _upload(client, auth_headers, [png_bytes(40)], coverage_percentage="85").json()
+    scan = client.get(f"/api/scans/{body['scan_id']}", headers=auth_headers).json()
+    scans = client.get("/api/scans/board/BOARD-1", headers=auth_headers).json()["scans"]
+
+    assert "coverage_percentage" not in body
+    assert "coverage_percentage" not in scan
+    assert all("coverage_percentage" not in entry for entry in scans)
@@ -0,0 +1,36 @@
+"""
+services/api/tests/test_storage.py
+Content-addressed storage in ImageManager
+"""
+
+import asyncio
+import io
+import os
+import time
+
+from starlette.datastructures import UploadFile
+
+from app.storage.image_manager import ImageManager
+
+
+def _save(manager, data):
+    upload = UploadFile(io.BytesIO(data), filename="frame.png")
+    return asyncio.run(manager.save_uploaded_file(upload, subfolder="frames"))
+
+
+def test_duplicate_upload_refreshes_mtime(tmp_path, png_bytes):
+    manager = ImageManager(str(tmp_path))
+    data = png_bytes(1)
+
+    first = _save(manager, data)
+    stored = tmp_path / first.removeprefix("/storage/")
+    week_ago = time.time() - 7 * 24 * 60 * 60
+    os.utime(stored, (week_ago, week_ago))
+
+    assert _save(manager, data) == first
+    assert stored.stat().st_mtime > week_ago
+
+    # The re-uploaded content survives age-based cleanup
+    assert manager.cleanup_old_files(days=1) == 0
+    assert stored.exists()
+    assert not list(stored.parent.glob(".*.part"))
@@ -0,0 +1,64 @@
+"""
+services/api/tests/test_traces.py
+Trace analysis endpoints and their worker pool
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from app.image_processing.trace_enhancement import TraceEnhancer
+from app.routers import traces
+
+
+def test_analyze_runs_in_lifespan_pool(client, png_bytes):
+    assert traces._trace_pool is not None
+
+    response = client.post(
+        "/api/traces/analyze",
+        files={"file": ("board.png", png_bytes(30, size=128), "image/png")},
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["image_info"]["size"] == [128, 128]
+
+
+def test_trace_pool_start_and_shutdown(monkeypatch):
+    monkeypatch.setattr(traces, "_trace_pool", None)
+
+    traces.start_trace_pool()
+    pool = traces._trace_pool
+    assert pool is not None
+    traces.start_trace_pool()
+    assert traces._trace_pool is pool
+
+    traces.shutdown_trace_pool()
+    assert traces._trace_pool is None
+
+
+def test_concurrent_stage_runs_do_not_share_state():
+    enhancer = TraceEnhancer()
+    image = cv2.cvtColor(
+        np.random.default_rng(5).integers(0, 256, (96, 96), dtype=np.uint8), cv2.COLOR_GRAY2BGR
+    )
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        runs = list(pool.map(lambda _: enhancer.process_with_stages(image)[1], range(16)))
+
+    assert {len(stages) for stages in runs} == {10}
+    assert len({id(stages) for stages in runs}) == 16
+
+
+def _worker_thread_count() -> int:
+    return cv2.getNumThreads()
+
+
+def test_trace_workers_use_forkserver_and_single_opencv_thread(monkeypatch):
+    monkeypatch.setattr(traces, "_trace_pool", None)
+    traces.start_trace_pool()
+    try:
+        pool = traces._trace_pool
+        assert pool._mp_context.get_start_method() == "forkserver"
+        assert pool.submit(_worker_thread_count).result(timeout=60) == 1
+    finally:
+        traces.shutdown_trace_pool()
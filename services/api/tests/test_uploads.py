@@ -0,0 +1,33 @@
+"""
+services/api/tests/test_uploads.py
+Upload storage and serving
+"""
+
+import os
+
+from app.routers import uploads
+
+
+def test_serve_upload_round_trip(client, png_bytes):
+    data = png_bytes(20)
+    stored = client.post("/api/uploads/image", files={"file": ("board.png", data, "image/png")}).json()
+
+    response = client.get(f"/api/uploads/{stored['filename']}")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert response.content == data
+
+
+def test_serve_upload_rejects_symlink_out_of_storage(client, tmp_path):
+    secret = tmp_path / "secret.png"
+    secret.write_bytes(b"outside storage")
+    link = os.path.join(uploads.STORAGE_PATH, "escape.png")
+    os.symlink(secret, link)
+    try:
+        assert client.get("/api/uploads/escape.png").status_code == 404
+    finally:
+        os.unlink(link)
+
+
+def test_serve_upload_missing_file(client):
+    assert client.get("/api/uploads/missing.png").status_code == 404